@@ -3,40 +3,308 @@ from __future__ import annotations
 
 import logging
 
+from homeassistant.components import bluetooth
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ADDRESS, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.const import CONF_ADDRESS, EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .capture import CaptureRecorder
+from .codec import FanCapabilities
+from .connection import ConnectionManager, ConnectPath
+from .const import (
+    CONF_CAPABILITIES,
+    CONF_CAPTURE,
+    CONF_MEMBERS,
+    CONF_PASSIVE,
+    CONF_TRACE,
+    CONNECT_PRIORITY_STARTUP,
+    DATA_CONNECTION_MANAGER,
+    DATA_ENTRY_PLATFORMS,
+    DOMAIN,
+    FANIMATION_SERVICE_UUID,
+    SIGNAL_DEVICES_CHANGED,
+)
+from .coordinator import FanimationBlePollingCoordinator
 from .device import FanimationBleDevice
+from .gatt import GattHandles
+from .group import FanimationBleGroup
+from .scenes import async_setup_scene_services
+from .snapshot import async_get_fleet_state, async_setup_snapshot_service
+from .storage import async_get_gatt_cache, async_get_state_cache
 
 _LOGGER = logging.getLogger(__name__)
-PLATFORMS: list[Platform] = [Platform.FAN, Platform.LIGHT]
+PLATFORMS: list[Platform] = [
+    Platform.FAN,
+    Platform.LIGHT,
+    Platform.NUMBER,
+    Platform.SENSOR,
+]
+GROUP_PLATFORMS: list[Platform] = [Platform.FAN]
+# Capability each optional platform needs, and the unique id suffix of its
+# entity
+OPTIONAL_PLATFORMS: dict[Platform, tuple[str, str]] = {
+    Platform.LIGHT: ("light", "light"),
+    Platform.NUMBER: ("timer", "timer"),
+}
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+def _get_device(hass: HomeAssistant, address: str) -> FanimationBleDevice | None:
+    """Return the loaded device with ``address``, if any."""
+    for device in hass.data.get(DOMAIN, {}).values():
+        if isinstance(device, FanimationBleDevice) and device.address == address:
+            return device
+    return None
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Fanimation BLE services."""
+    async_setup_scene_services(hass, lambda address: _get_device(hass, address))
+    async_setup_snapshot_service(hass)
+    return True
+
+
+async def _async_setup_group_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up a group of Fanimation BLE fans from a config entry."""
+    # Members are looked up on every command so they can load in any order
+    group = FanimationBleGroup(
+        entry.data[CONF_MEMBERS], lambda address: _get_device(hass, address)
+    )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = group
+    await hass.config_entries.async_forward_entry_setups(entry, GROUP_PLATFORMS)
+    return True
+
+
+def _supported_platforms(capabilities: FanCapabilities | None) -> list[Platform]:
+    """Return the platforms of a fan with ``capabilities``, all if unknown."""
+    if capabilities is None:
+        return PLATFORMS
+    return [
+        platform
+        for platform in PLATFORMS
+        if platform not in OPTIONAL_PLATFORMS
+        or getattr(capabilities, OPTIONAL_PLATFORMS[platform][0])
+    ]
+
+
+@callback
+def _async_remove_unsupported_entities(
+    hass: HomeAssistant, entry: ConfigEntry, capabilities: FanCapabilities
+) -> None:
+    """Remove entities left from before the fan's capabilities were known."""
+    address = entry.data[CONF_ADDRESS]
+    unsupported = {
+        f"{address}_{suffix}"
+        for capability, suffix in OPTIONAL_PLATFORMS.values()
+        if not getattr(capabilities, capability)
+    }
+    registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity.unique_id in unsupported:
+            registry.async_remove(entity.entity_id)
+
+
+@callback
+def _async_connect_paths(hass: HomeAssistant, address: str) -> list[ConnectPath]:
+    """Return every connectable adapter or proxy that can hear ``address``."""
+    return [
+        ConnectPath(
+            scanner_device.scanner.source,
+            scanner_device.advertisement.rssi,
+            scanner_device.ble_device,
+        )
+        for scanner_device in bluetooth.async_scanner_devices_by_address(
+            hass, address, connectable=True
+        )
+    ]
+
+
+def _advertised_status(
+    service_info: bluetooth.BluetoothServiceInfoBleak,
+) -> bytes | None:
+    """Return the status payload carried in an advertisement, if any."""
+    if data := service_info.service_data.get(FANIMATION_SERVICE_UUID):
+        return data
+    # Fall back to manufacturer data; the decoder rejects anything that
+    # isn't a well formed status frame
+    return next(iter(service_info.manufacturer_data.values()), None)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Fanimation BLE from a config entry."""
+    if CONF_MEMBERS in entry.data:
+        return await _async_setup_group_entry(hass, entry)
+
     address = entry.data[CONF_ADDRESS]
     _LOGGER.debug("Setting up Fanimation BLE device at address %s", address)
 
+    # All devices share one manager so connects are spread across adapters
+    connection_manager: ConnectionManager = hass.data.setdefault(
+        DATA_CONNECTION_MANAGER, ConnectionManager()
+    )
+    adapter = None
+    if last_service_info := bluetooth.async_last_service_info(
+        hass, address, connectable=True
+    ):
+        adapter = last_service_info.source
+
     # Create a single device object to be shared by all entities
-    device = FanimationBleDevice(address)
-    if not await device.connect():
-        raise ConfigEntryNotReady(f"Could not connect to BLE device at {address}")
+    passive = entry.options.get(CONF_PASSIVE, False)
+    device = FanimationBleDevice(
+        address,
+        connection_manager,
+        adapter,
+        passive=passive,
+        path_finder=lambda: _async_connect_paths(hass, address),
+        state_store=async_get_fleet_state(hass),
+    )
+    device.trace.set_buffering(entry.options.get(CONF_TRACE, False))
+    if entry.options.get(CONF_CAPTURE, False):
+        recorder = CaptureRecorder(
+            hass.config.path(f"{DOMAIN}_{address.replace(':', '').lower()}.jsonl")
+        )
+        recorder.start()
+        device.trace.set_recorder(recorder)
+
+        async def _async_close_recorder(event: Event) -> None:
+            """Write out queued frames; entries aren't unloaded at shutdown."""
+            device.trace.set_recorder(None)
+            await hass.async_add_executor_job(recorder.close)
+
+        entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_recorder)
+        )
+
+    # Show the last known state right away instead of waiting for the radio
+    state_cache = await async_get_state_cache(hass)
+    if (status := state_cache.get(address)) is not None:
+        device.restore_state(status)
+    entry.async_on_unload(
+        device.async_subscribe(
+            lambda changed: state_cache.async_update(address, device.status)
+        )
+    )
+
+    # Reuse handles from an earlier service discovery on the first connect
+    gatt_cache = await async_get_gatt_cache(hass)
+    device.gatt_handles = gatt_cache.get(address)
+
+    @callback
+    def _async_save_gatt_handles(handles: GattHandles | None) -> None:
+        """Save newly resolved handles, or forget stale ones."""
+        if handles is None:
+            gatt_cache.async_remove(address)
+        else:
+            gatt_cache.async_update(address, handles)
+
+    device.gatt_handles_listener = _async_save_gatt_handles
+
+    # Features come from the fan's first status frame. Setup doesn't wait
+    # for it: every platform is loaded until then, and the entry is reloaded
+    # once if the fan reported its features. Fans that don't report them
+    # are probed again on every setup, so a firmware update is picked up.
+    saved = entry.data.get(CONF_CAPABILITIES)
+    if saved is not None and saved.get("reported"):
+        device.capabilities = FanCapabilities(**saved)
+    else:
+
+        @callback
+        def _async_save_capabilities(capabilities: FanCapabilities) -> None:
+            """Cache reported features, reloading if platforms were loaded."""
+            if not capabilities.reported:
+                return
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_CAPABILITIES: capabilities._asdict()}
+            )
+            if entry.entry_id in hass.data.get(DATA_ENTRY_PLATFORMS, {}):
+                hass.config_entries.async_schedule_reload(entry.entry_id)
+
+        device.capabilities_listener = _async_save_capabilities
+
+    if passive:
+
+        @callback
+        def _async_handle_advertisement(
+            service_info: bluetooth.BluetoothServiceInfoBleak,
+            change: bluetooth.BluetoothChange,
+        ) -> None:
+            """Update the device from an advertisement."""
+            if (data := _advertised_status(service_info)) is not None:
+                device.handle_advertisement(data)
+
+        if last_service_info is not None:
+            _async_handle_advertisement(
+                last_service_info, bluetooth.BluetoothChange.ADVERTISEMENT
+            )
+        entry.async_on_unload(
+            bluetooth.async_register_callback(
+                hass,
+                _async_handle_advertisement,
+                bluetooth.BluetoothCallbackMatcher(address=address),
+                bluetooth.BluetoothScanningMode.PASSIVE,
+            )
+        )
+    else:
+        device.start_connecting(CONNECT_PRIORITY_STARTUP)
+        # Passive devices get their state from advertisements instead
+        coordinator = FanimationBlePollingCoordinator(hass, device)
+        coordinator.async_start()
+        entry.async_on_unload(coordinator.async_stop)
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = device
+    # Groups follow their members, which may load after the group
+    async_dispatcher_send(hass, SIGNAL_DEVICES_CHANGED)
+
+    if device.capabilities is not None:
+        _async_remove_unsupported_entities(hass, entry, device.capabilities)
+
+    # Forward the setup to the platforms of the features the fan has
+    platforms = _supported_platforms(device.capabilities)
+    hass.data.setdefault(DATA_ENTRY_PLATFORMS, {})[entry.entry_id] = platforms
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
 
-    # Forward the setup to the fan and light platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    options = dict(entry.options)
+
+    async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the entry when its options change."""
+        # Saving probed capabilities updates the entry data, which needs none
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the saved state and GATT handles of a removed fan."""
+    if CONF_ADDRESS in entry.data:
+        state_cache = await async_get_state_cache(hass)
+        state_cache.async_remove(entry.data[CONF_ADDRESS])
+        gatt_cache = await async_get_gatt_cache(hass)
+        gatt_cache.async_remove(entry.data[CONF_ADDRESS])
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        device: FanimationBleDevice = hass.data[DOMAIN].pop(entry.entry_id)
-        await device.disconnect()
+    if CONF_MEMBERS in entry.data:
+        platforms = GROUP_PLATFORMS
+    else:
+        platforms = hass.data.get(DATA_ENTRY_PLATFORMS, {})[entry.entry_id]
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, platforms):
+        hass.data.get(DATA_ENTRY_PLATFORMS, {}).pop(entry.entry_id, None)
+        device = hass.data[DOMAIN].pop(entry.entry_id)
+        if isinstance(device, FanimationBleDevice):
+            async_dispatcher_send(hass, SIGNAL_DEVICES_CHANGED)
+            await device.disconnect()
+            device.release_state()
+            if (recorder := device.trace.recorder) is not None:
+                device.trace.set_recorder(None)
+                await hass.async_add_executor_job(recorder.close)
 
     return unload_ok
\ No newline at end of file
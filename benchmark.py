@@ -0,0 +1,80 @@
+"""Micro-benchmarks for the Fanimation BLE frame codec.
+
+Run from the Home Assistant config directory with:
+
+    python -m custom_components.fanimation_ble.benchmark
+
+Reports encode and decode throughput, and the peak memory allocated while
+running the hot paths. For repeated frames the peak should stay at the
+interpreter's small fixed call overhead no matter how many iterations run.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import timeit
+import tracemalloc
+
+from .codec import FrameEncoder, StatusDecoder
+
+STATUS_FRAME = bytes.fromhex("5331050100640a0000f8")
+OTHER_STATUS_FRAME = bytes.fromhex("53310f00000000000093")
+
+
+def _peak_allocation(func, iterations: int) -> int:
+    """Return the peak bytes allocated above baseline across ``iterations`` calls."""
+    func()  # Warm up caches so only steady-state work is measured
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(iterations):
+            func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def _report(name: str, func, iterations: int) -> None:
+    """Print throughput and allocations for ``func``."""
+    seconds = timeit.timeit(func, number=iterations)
+    peak = _peak_allocation(func, iterations)
+    print(
+        f"{name:<24} {iterations / seconds:>12,.0f} ops/s"
+        f" {seconds / iterations * 1e9:>8.0f} ns/op"
+        f" {peak:>6} bytes peak allocation"
+    )
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    encoder = FrameEncoder()
+    decoder = StatusDecoder()
+    frames = (STATUS_FRAME, OTHER_STATUS_FRAME)
+    state = itertools.count()
+
+    _report(
+        "encode (unchanged)",
+        lambda: encoder.encode(5, 1, 100, 10),
+        args.iterations,
+    )
+    _report(
+        "encode (changing)",
+        lambda: encoder.encode(next(state) & 0x1F, 0, 100, 10),
+        args.iterations,
+    )
+    _report("decode (repeated)", lambda: decoder.decode(STATUS_FRAME), args.iterations)
+    _report(
+        "decode (alternating)",
+        lambda: decoder.decode(frames[next(state) & 1]),
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Recording of protocol frames to capture files.
+
+A capture is a JSON lines file with one object per frame: ``t`` is the
+Unix time, ``a`` the fan address, ``d`` the direction (see trace.py) and
+``f`` the raw frame in hex.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import json
+import logging
+from pathlib import Path
+import queue
+import threading
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CaptureFrame(NamedTuple):
+    """One frame read back from a capture."""
+
+    time: float
+    address: str
+    direction: str
+    frame: bytes
+
+
+class CaptureRecorder:
+    """Append frames to a capture file from a background thread.
+
+    ``record`` only puts a tuple on a queue, so the event loop never waits
+    on the file system and several devices can share one recorder.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the recorder; call ``start`` to begin writing."""
+        self.path = Path(path)
+        self.dropped = 0
+        self._queue: queue.SimpleQueue[tuple[float, str, str, bytes] | None] = (
+            queue.SimpleQueue()
+        )
+        # Daemon so a recorder that is never closed can't hold up exit
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"fanimation_ble capture {self.path.name}",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self._thread.start()
+
+    def record(
+        self, timestamp: float, address: str, direction: str, frame: bytes
+    ) -> None:
+        """Queue a frame for writing."""
+        self._queue.put((timestamp, address, direction, frame))
+
+    def close(self) -> None:
+        """Write out queued frames and stop; blocks until the file is closed."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Write queued frames until ``close`` is called."""
+        try:
+            with self.path.open("a", encoding="utf-8") as file:
+                while (item := self._queue.get()) is not None:
+                    timestamp, address, direction, frame = item
+                    line = {"t": timestamp, "a": address, "d": direction}
+                    line["f"] = frame.hex()
+                    file.write(json.dumps(line) + "\n")
+                    # Write in batches while frames keep arriving
+                    if self._queue.empty():
+                        file.flush()
+        except OSError as err:
+            _LOGGER.error("Failed to write capture %s: %s", self.path, err)
+            # Keep draining so producers never block on a dead recorder
+            while self._queue.get() is not None:
+                self.dropped += 1
+
+
+def iter_capture(path: str | Path) -> Iterator[CaptureFrame]:
+    """Yield the frames of a capture one at a time.
+
+    Lines that are not valid frames are skipped with a warning, so a capture
+    cut short by a crash can still be read.
+    """
+    with Path(path).open(encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                yield CaptureFrame(
+                    float(item["t"]), item["a"], item["d"], bytes.fromhex(item["f"])
+                )
+            except (ValueError, KeyError, TypeError) as err:
+                _LOGGER.warning("Skipping line %d of %s: %s", line_number, path, err)
@@ -0,0 +1,151 @@
+"""Frame encoding and decoding for the Fanimation BLE protocol.
+
+Every frame is 10 bytes: a 0x53 header, the command type, seven payload
+bytes and a checksum that is the low byte of the sum of the first nine.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+FRAME_HEADER = 0x53
+FRAME_LENGTH = 10
+
+CMD_READ_STATUS = 0x30
+CMD_WRITE_STATE = 0x31
+
+# Byte offsets within a frame
+IDX_COMMAND = 1
+IDX_SPEED = 2
+IDX_DIRECTION = 3
+IDX_FEATURES = 4
+IDX_BRIGHTNESS = 5
+IDX_TIMER = 6
+IDX_CHECKSUM = 9
+
+# Feature bits of a status frame. Current firmware sends byte 4 as 0, so
+# this is a proposed firmware extension, not something fans report today:
+# a fan that leaves FEATURES_REPORTED clear is taken to support everything
+FEATURE_LIGHT = 0x01
+FEATURE_REVERSE = 0x02
+FEATURE_TIMER = 0x04
+FEATURES_REPORTED = 0x80
+
+
+def compute_checksum(frame) -> int:
+    """Return the checksum for the first nine bytes of ``frame``."""
+    return (sum(frame) - frame[IDX_CHECKSUM]) & 0xFF
+
+
+def _build_frame(command_type: int) -> bytearray:
+    """Return an empty frame of ``command_type`` with a valid checksum."""
+    frame = bytearray(FRAME_LENGTH)
+    frame[0] = FRAME_HEADER
+    frame[IDX_COMMAND] = command_type
+    frame[IDX_CHECKSUM] = compute_checksum(frame)
+    return frame
+
+
+# A status request carries no payload, so it never changes
+READ_STATUS_FRAME = bytes(_build_frame(CMD_READ_STATUS))
+
+
+class FanStatus(NamedTuple):
+    """Decoded contents of a status frame."""
+
+    speed: int
+    direction: int
+    brightness: int
+    timer_minutes: int
+
+
+class FanCapabilities(NamedTuple):
+    """Features a fan has, as described by its status frames."""
+
+    light: bool = True
+    reverse: bool = True
+    timer: bool = True
+    # False when the fan didn't describe itself and everything is assumed
+    reported: bool = False
+
+    @classmethod
+    def from_frame(cls, frame) -> FanCapabilities:
+        """Return the capabilities described by a valid status frame."""
+        features = frame[IDX_FEATURES]
+        if not features & FEATURES_REPORTED:
+            return cls()
+        return cls(
+            bool(features & FEATURE_LIGHT),
+            bool(features & FEATURE_REVERSE),
+            bool(features & FEATURE_TIMER),
+            True,
+        )
+
+    @property
+    def model(self) -> str:
+        """Return the model name shown for a fan with these features."""
+        return "Smart Fan with Light" if self.reported and self.light else "Smart Fan"
+
+
+class FrameEncoder:
+    """Encode 0x31 frames into a single reusable buffer.
+
+    The checksum is kept as a running sum and adjusted only for bytes that
+    change, so encoding an unchanged state only compares four bytes. The
+    returned buffer is overwritten by the next call.
+    """
+
+    __slots__ = ("_frame", "_sum")
+
+    def __init__(self) -> None:
+        """Initialize the encoder."""
+        self._frame = _build_frame(CMD_WRITE_STATE)
+        self._sum = FRAME_HEADER + CMD_WRITE_STATE
+
+    def _set(self, index: int, value: int) -> None:
+        """Store ``value`` at ``index`` and update the running checksum."""
+        old = self._frame[index]
+        if old != value:
+            self._frame[index] = value
+            self._sum += value - old
+
+    def encode(
+        self, speed: int, direction: int, brightness: int, timer_minutes: int
+    ) -> bytearray:
+        """Return a 0x31 frame for the given state."""
+        self._set(IDX_SPEED, speed)
+        self._set(IDX_DIRECTION, direction)
+        self._set(IDX_BRIGHTNESS, brightness)
+        self._set(IDX_TIMER, timer_minutes)
+        self._frame[IDX_CHECKSUM] = self._sum & 0xFF
+        return self._frame
+
+
+class StatusDecoder:
+    """Validate and decode status notifications.
+
+    The last valid frame is remembered so a repeated notification is
+    recognised by a plain comparison and returns the cached status without
+    re-summing or allocating.
+    """
+
+    __slots__ = ("_last_frame", "_last_status")
+
+    def __init__(self) -> None:
+        """Initialize the decoder."""
+        self._last_frame = b""
+        self._last_status: FanStatus | None = None
+
+    def decode(self, data) -> FanStatus | None:
+        """Return the status carried by ``data``, or None if it is invalid."""
+        if data == self._last_frame:
+            return self._last_status
+
+        view = memoryview(data)
+        if len(view) != FRAME_LENGTH or compute_checksum(view) != view[IDX_CHECKSUM]:
+            return None
+
+        self._last_frame = view.tobytes()
+        self._last_status = FanStatus(
+            view[IDX_SPEED], view[IDX_DIRECTION], view[IDX_BRIGHTNESS], view[IDX_TIMER]
+        )
+        return self._last_status
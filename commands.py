@@ -0,0 +1,144 @@
+"""Per-device command queue for Fanimation BLE."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import logging
+
+from .const import DEFAULT_COMMAND_QUEUE_DEPTH
+from .metrics import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _QueuedCommand:
+    """A command waiting for its turn; ordered by priority, then arrival."""
+
+    priority: int
+    sequence: int
+    run: Callable[[], Awaitable[bool]] = field(compare=False)
+    future: asyncio.Future[bool] = field(compare=False)
+    poll: bool = field(compare=False)
+    queued_at: float = field(compare=False)
+
+
+class CommandQueue:
+    """Send one device's commands one at a time, most urgent first.
+
+    Status polls are only worth sending when nothing else is going to make
+    the fan report its state: a queued poll is dropped when a write is
+    queued, and a poll submitted behind a write is not queued at all. A
+    full queue drops new polls and makes writers wait for a free place.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_COMMAND_QUEUE_DEPTH) -> None:
+        """Initialize the queue."""
+        self.max_depth = max_depth
+        self._heap: list[_QueuedCommand] = []
+        self._sequence = itertools.count()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._worker: asyncio.Task[None] | None = None
+        self._running: _QueuedCommand | None = None
+        self.dropped_polls = 0
+        # Time from submitting a command until it starts being sent
+        self.wait_time = LatencyHistogram()
+
+    def __len__(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._heap)
+
+    def _write_pending(self) -> bool:
+        """Return true if a write is queued or being sent."""
+        running = self._running
+        return (running is not None and not running.poll) or any(
+            not command.poll for command in self._heap
+        )
+
+    async def async_submit(
+        self, run: Callable[[], Awaitable[bool]], priority: int, poll: bool = False
+    ) -> bool:
+        """Queue ``run`` and return its result once it has been sent."""
+        loop = asyncio.get_running_loop()
+        if poll:
+            if self._write_pending():
+                # The write's status notification answers this poll
+                self.dropped_polls += 1
+                return True
+            for command in self._heap:
+                if command.poll:
+                    return await asyncio.shield(command.future)
+            if len(self._heap) >= self.max_depth:
+                self.dropped_polls += 1
+                return False
+        else:
+            self._drop_polls()
+            while len(self._heap) >= self.max_depth:
+                await self._space.wait()
+
+        command = _QueuedCommand(
+            priority, next(self._sequence), run, loop.create_future(), poll, loop.time()
+        )
+        heapq.heappush(self._heap, command)
+        self._update_space()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._async_run())
+        return await command.future
+
+    def _drop_polls(self) -> None:
+        """Answer every queued poll without sending it."""
+        if not any(command.poll for command in self._heap):
+            return
+        kept = []
+        for command in self._heap:
+            if command.poll:
+                self.dropped_polls += 1
+                if not command.future.done():
+                    command.future.set_result(True)
+            else:
+                kept.append(command)
+        heapq.heapify(kept)
+        self._heap = kept
+        self._update_space()
+
+    def _update_space(self) -> None:
+        """Let waiting writers in once the queue has room."""
+        if len(self._heap) < self.max_depth:
+            self._space.set()
+        else:
+            self._space.clear()
+
+    async def _async_run(self) -> None:
+        """Send queued commands until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while self._heap:
+            command = heapq.heappop(self._heap)
+            self._update_space()
+            if command.future.done():
+                # The caller gave up while the command was queued
+                continue
+            self.wait_time.record(loop.time() - command.queued_at)
+            self._running = command
+            try:
+                result = await command.run()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Queued command failed: %s", err)
+                if not command.future.done():
+                    command.future.set_exception(err)
+            else:
+                if not command.future.done():
+                    command.future.set_result(result)
+            finally:
+                self._running = None
+
+    def clear(self) -> None:
+        """Fail every queued command; the one being sent is left to finish."""
+        for command in self._heap:
+            if not command.future.done():
+                command.future.set_result(False)
+        self._heap.clear()
+        self._update_space()
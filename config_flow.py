@@ -2,14 +2,26 @@
 import voluptuous as vol
 import logging
 
-from homeassistant.components.bluetooth import (
-    BluetoothServiceInfoBleak,
-    async_discovered_service_info,
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.config_entries import (
+    SOURCE_IMPORT,
+    ConfigEntry,
+    ConfigFlow,
+    OptionsFlow,
 )
-from homeassistant.config_entries import ConfigFlow
-from homeassistant.const import CONF_ADDRESS
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, FANIMATION_SERVICE_UUID
+from .const import (
+    CONF_CAPTURE,
+    CONF_MEMBERS,
+    CONF_PASSIVE,
+    CONF_TRACE,
+    DOMAIN,
+    FANIMATION_SERVICE_UUID,
+)
+from .discovery import async_discovered_fans, async_probe_fans
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,45 +36,134 @@ class FanimationBleConfigFlow(ConfigFlow, domain=DOMAIN):
         self._discovery_info: BluetoothServiceInfoBleak | None = None
         _LOGGER.debug("FanimationBleConfigFlow initialized")
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow for this handler."""
+        return FanimationBleOptionsFlow()
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(cls, config_entry: ConfigEntry) -> bool:
+        """Return true if the entry is a single fan; groups have no options."""
+        return CONF_ADDRESS in config_entry.data
+
     async def async_step_user(self, user_input=None):
-        """Handle the user step to select a device."""
-        _LOGGER.debug("async_step_user called with user_input: %s", user_input)
-        if user_input is not None:
-            address = user_input[CONF_ADDRESS]
-            _LOGGER.debug("User selected address: %s", address)
-            await self.async_set_unique_id(address, raise_on_progress=False)
-            self._abort_if_unique_id_configured()
-            _LOGGER.debug("Creating entry for address: %s", address)
-            return self.async_create_entry(
-                title=user_input["name"], data={CONF_ADDRESS: address}
-            )
+        """Let the user choose between adding a fan or a group of fans."""
+        return self.async_show_menu(step_id="user", menu_options=["device", "group"])
+
+    async def async_step_group(self, user_input=None):
+        """Handle the step to create a group from configured fans."""
+        devices = {
+            entry.data[CONF_ADDRESS]: entry.title
+            for entry in self._async_current_entries()
+            if CONF_ADDRESS in entry.data
+        }
+        if not devices:
+            return self.async_abort(reason="no_devices_configured")
 
-        current_addresses = self._async_current_entries()
-        _LOGGER.debug("Current addresses: %s", current_addresses)
-        for discovery_info in async_discovered_service_info(self.hass):
-            _LOGGER.debug("Discovered device: %s", discovery_info)
-            if discovery_info.address in current_addresses:
-                _LOGGER.debug(
-                    "Device %s already configured, skipping", discovery_info.address
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MEMBERS]:
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data={CONF_MEMBERS: user_input[CONF_MEMBERS]},
                 )
-                continue
+            errors["base"] = "no_members"
+
+        return self.async_show_form(
+            step_id="group",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NAME): str,
+                    vol.Required(CONF_MEMBERS): cv.multi_select(devices),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_device(self, user_input=None):
+        """Handle the step to select one or more discovered fans."""
+        fans = async_discovered_fans(self.hass, self._async_current_ids())
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Discovered unconfigured fans: %s", ", ".join(fans))
+        if not fans:
+            return self.async_abort(reason="no_devices_found")
+
+        errors = {}
+        placeholders = {"failed": ""}
+        if user_input is not None:
+            # A fan may have stopped advertising or been configured by
+            # another flow since the form was shown
+            selected = [
+                fans[address] for address in user_input[CONF_ADDRESS] if address in fans
+            ]
+            if missing := [
+                address for address in user_input[CONF_ADDRESS] if address not in fans
+            ]:
+                errors["base"] = "unavailable"
+                placeholders["failed"] = ", ".join(missing)
+            elif not selected:
+                errors["base"] = "no_members"
+            else:
+                results = await async_probe_fans(self.hass, selected)
+                if failed := [fan for fan in selected if not results[fan.address]]:
+                    errors["base"] = "cannot_connect"
+                    placeholders["failed"] = ", ".join(fan.name for fan in failed)
+                else:
+                    return await self._async_create_entries(selected)
+
+        return self.async_show_form(
+            step_id="device",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_ADDRESS): cv.multi_select(
+                        {
+                            address: f"{fan.name} ({address})"
+                            for address, fan in fans.items()
+                        }
+                    ),
+                }
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
 
-            if FANIMATION_SERVICE_UUID in discovery_info.service_uuids:
-                _LOGGER.debug(
-                    "Device %s matches service UUID, proceeding to bluetooth step",
-                    discovery_info.address,
+    async def _async_create_entries(self, fans):
+        """Create an entry for the first fan and start import flows for the rest."""
+        for fan in fans[1:]:
+            self.hass.async_create_task(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": SOURCE_IMPORT},
+                    data={CONF_ADDRESS: fan.address, CONF_NAME: fan.name},
                 )
-                return await self.async_step_bluetooth(discovery_info)
+            )
+        first = fans[0]
+        await self.async_set_unique_id(first.address, raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=first.name, data={CONF_ADDRESS: first.address}
+        )
 
-        _LOGGER.debug("No devices found, aborting flow")
-        return self.async_abort(reason="no_devices_found")
+    async def async_step_import(self, import_data):
+        """Create an entry for a fan selected together with others."""
+        address = import_data[CONF_ADDRESS]
+        _LOGGER.debug("Creating entry for additionally selected fan: %s", address)
+        await self.async_set_unique_id(address, raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=import_data[CONF_NAME], data={CONF_ADDRESS: address}
+        )
 
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> dict:
         """Handle discovery via Bluetooth."""
         _LOGGER.debug(
-            "async_step_bluetooth called with discovery_info: %s", discovery_info
+            "Bluetooth discovery of %s (%s)",
+            discovery_info.name,
+            discovery_info.address,
         )
         await self.async_set_unique_id(discovery_info.address)
         self._abort_if_unique_id_configured()
@@ -81,4 +182,33 @@ class FanimationBleConfigFlow(ConfigFlow, domain=DOMAIN):
         return self.async_create_entry(
             title=discovery_info.name,
             data={CONF_ADDRESS: discovery_info.address},
-        )
\ No newline at end of file
+        )
+
+
+class FanimationBleOptionsFlow(OptionsFlow):
+    """Handle options for a Fanimation BLE fan."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PASSIVE,
+                        default=self.config_entry.options.get(CONF_PASSIVE, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_TRACE,
+                        default=self.config_entry.options.get(CONF_TRACE, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_CAPTURE,
+                        default=self.config_entry.options.get(CONF_CAPTURE, False),
+                    ): bool,
+                }
+            ),
+        )
@@ -0,0 +1,234 @@
+"""Connection slot management shared by all Fanimation BLE devices."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any
+
+from .const import (
+    ADAPTER_FAILURE_PENALTY,
+    ADAPTER_LOAD_PENALTY,
+    ADAPTER_STICKY_BONUS,
+    CONNECT_PRIORITY_BACKGROUND,
+    DEFAULT_ADAPTER,
+    DEFAULT_CONNECT_BACKOFF_BASE,
+    DEFAULT_CONNECT_BACKOFF_MAX,
+    DEFAULT_CONNECT_SLOTS,
+    DEFAULT_CONNECT_STAGGER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class BackoffState:
+    """Connect failure history for a single address."""
+
+    failures: int = 0
+    next_attempt: float = 0.0
+
+
+@dataclass(frozen=True)
+class ConnectPath:
+    """One way to reach a fan: an adapter or proxy that can hear it."""
+
+    adapter: str
+    rssi: int
+    # Passed to the client factory in place of the address, e.g. a BLEDevice
+    target: Any
+
+
+class _AdapterSlots:
+    """Priority-ordered connect slots for one adapter."""
+
+    def __init__(self, limit: int, stagger: float) -> None:
+        """Initialize the slots."""
+        self.limit = limit
+        self.stagger = stagger
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._next_start = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Return the number of connects waiting for a slot."""
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def async_acquire(self, priority: int) -> None:
+        """Wait for a slot, then for this adapter's stagger delay."""
+        loop = asyncio.get_running_loop()
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+        else:
+            waiter: asyncio.Future[None] = loop.create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed to us just before we were cancelled.
+                    self.release()
+                raise
+
+        now = loop.time()
+        start = max(now, self._next_start)
+        self._next_start = start + self.stagger
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+    def release(self) -> None:
+        """Hand the slot to the highest priority waiter, or free it."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class ConnectionManager:
+    """Hand out connect slots per adapter and track per-address backoff."""
+
+    def __init__(
+        self,
+        slots_per_adapter: int = DEFAULT_CONNECT_SLOTS,
+        stagger: float = DEFAULT_CONNECT_STAGGER,
+        backoff_base: float = DEFAULT_CONNECT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_CONNECT_BACKOFF_MAX,
+    ) -> None:
+        """Initialize the manager."""
+        self.slots_per_adapter = slots_per_adapter
+        self.stagger = stagger
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._adapters: dict[str, _AdapterSlots] = {}
+        self._backoff: dict[str, BackoffState] = {}
+        # Consecutive connect failures per (address, adapter)
+        self._path_failures: dict[tuple[str, str], int] = {}
+        # Adapter that made the last successful connect to each address
+        self.assignments: dict[str, str] = {}
+        # Open connections by address, with the adapter holding each
+        self._connected: dict[str, str] = {}
+
+    def _slots(self, adapter: str | None) -> _AdapterSlots:
+        """Return the slots for an adapter, creating them on first use."""
+        adapter = adapter or DEFAULT_ADAPTER
+        if (slots := self._adapters.get(adapter)) is None:
+            slots = self._adapters[adapter] = _AdapterSlots(
+                self.slots_per_adapter, self.stagger
+            )
+        return slots
+
+    @asynccontextmanager
+    async def async_connect_slot(
+        self,
+        address: str,
+        adapter: str | None = None,
+        priority: int = CONNECT_PRIORITY_BACKGROUND,
+    ) -> AsyncIterator[None]:
+        """Hold a connect slot on ``adapter`` for the duration of the block."""
+        if (delay := self.backoff_remaining(address)) > 0:
+            _LOGGER.debug("Delaying connect to %s for %.1fs", address, delay)
+            await asyncio.sleep(delay)
+
+        slots = self._slots(adapter)
+        await slots.async_acquire(priority)
+        try:
+            yield
+        finally:
+            slots.release()
+
+    def choose_path(
+        self, address: str, paths: list[ConnectPath]
+    ) -> ConnectPath | None:
+        """Return the best path to ``address``, or None if there is none.
+
+        Paths are ranked by RSSI, less a penalty for the connections open
+        or being made on their adapter and for recent failures through it,
+        so a fan moves to another adapter once its usual one keeps failing.
+        """
+        current = self.assignments.get(address)
+        connected = self._connected_counts()
+
+        def _score(path: ConnectPath) -> float:
+            # Open connections hold the adapter's slots long after connecting
+            load = connected.get(path.adapter, 0)
+            if (slots := self._adapters.get(path.adapter)) is not None:
+                load += slots.active + slots.queued
+            score = path.rssi - ADAPTER_LOAD_PENALTY * load
+            score -= ADAPTER_FAILURE_PENALTY * self._path_failures.get(
+                (address, path.adapter), 0
+            )
+            if path.adapter == current:
+                score += ADAPTER_STICKY_BONUS
+            return score
+
+        return max(paths, key=_score, default=None)
+
+    def backoff_remaining(self, address: str) -> float:
+        """Return how long until ``address`` may be connected again."""
+        if (state := self._backoff.get(address)) is None:
+            return 0.0
+        return max(0.0, state.next_attempt - time.monotonic())
+
+    def record_success(self, address: str, adapter: str | None = None) -> None:
+        """Clear the backoff state after a successful connect."""
+        self._backoff.pop(address, None)
+        adapter = adapter or DEFAULT_ADAPTER
+        self._path_failures.pop((address, adapter), None)
+        self._connected[address] = adapter
+        if self.assignments.get(address) != adapter:
+            _LOGGER.debug("%s is now connected through %s", address, adapter)
+            self.assignments[address] = adapter
+
+    def record_disconnect(self, address: str) -> None:
+        """Stop counting the connection to ``address`` against its adapter."""
+        self._connected.pop(address, None)
+
+    def _connected_counts(self) -> dict[str, int]:
+        """Return the number of open connections per adapter."""
+        counts: dict[str, int] = {}
+        for adapter in self._connected.values():
+            counts[adapter] = counts.get(adapter, 0) + 1
+        return counts
+
+    def record_failure(self, address: str, adapter: str | None = None) -> float:
+        """Record a failed connect and return the resulting backoff delay.
+
+        The delay doubles with every consecutive failure and is jittered
+        down by up to half so devices that dropped together don't retry in
+        lockstep.
+        """
+        key = (address, adapter or DEFAULT_ADAPTER)
+        self._path_failures[key] = self._path_failures.get(key, 0) + 1
+        state = self._backoff.setdefault(address, BackoffState())
+        state.failures += 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (state.failures - 1))
+        delay *= random.uniform(0.5, 1.0)
+        state.next_attempt = time.monotonic() + delay
+        return delay
+
+    def adapter_usage(self) -> dict[str, dict[str, int]]:
+        """Return open connections and active and queued connects per adapter."""
+        connected = self._connected_counts()
+        usage = {}
+        for adapter in self._adapters.keys() | connected.keys():
+            slots = self._adapters.get(adapter)
+            usage[adapter] = {
+                "connected": connected.get(adapter, 0),
+                "active": slots.active if slots else 0,
+                "queued": slots.queued if slots else 0,
+            }
+        return usage
@@ -8,4 +8,114 @@ DOMAIN = "fanimation_ble"
 
 FANIMATION_SERVICE_UUID = "0000fee7-0000-1000-8000-00805f9b34fb" # Example Service UUID
 COMMAND_WRITE_UUID = "0000e001-0000-1000-8000-00805f9b34fb"  # The characteristic for writing all commands
-STATUS_NOTIFY_UUID = "0000e002-0000-1000-8000-00805f9b34fb"  # The characteristic for receiving status updates
\ No newline at end of file
+STATUS_NOTIFY_UUID = "0000e002-0000-1000-8000-00805f9b34fb"  # The characteristic for receiving status updates
+
+# Writes requested within this window (seconds) are merged into one frame.
+DEFAULT_WRITE_DEBOUNCE = 0.05
+# Upper bound (seconds) on how long a merged write may be held back.
+DEFAULT_WRITE_MAX_DELAY = 0.25
+
+# hass.data key for the ConnectionManager shared by all config entries.
+DATA_CONNECTION_MANAGER = f"{DOMAIN}_connection_manager"
+# Slot key used when the adapter serving a device is not known.
+DEFAULT_ADAPTER = "default"
+# Concurrent connect attempts allowed per adapter.
+DEFAULT_CONNECT_SLOTS = 2
+# Minimum spacing (seconds) between connect starts on one adapter.
+DEFAULT_CONNECT_STAGGER = 0.5
+# Per-address exponential backoff (seconds) after failed connects.
+DEFAULT_CONNECT_BACKOFF_BASE = 2.0
+DEFAULT_CONNECT_BACKOFF_MAX = 120.0
+
+# Connect priorities, lower values are served first.
+CONNECT_PRIORITY_USER = 0
+CONNECT_PRIORITY_STARTUP = 1
+CONNECT_PRIORITY_BACKGROUND = 2
+
+# Config entry key listing member addresses of a fan group entry.
+CONF_MEMBERS = "members"
+# Members of a group that are written to at the same time.
+DEFAULT_GROUP_CONCURRENCY = 10
+# Dispatcher signal sent when a fan's device is loaded or unloaded.
+SIGNAL_DEVICES_CHANGED = f"{DOMAIN}_devices_changed"
+
+# Options key enabling advertisement-based state tracking.
+CONF_PASSIVE = "passive"
+# Seconds an on-demand connection stays open after the last write.
+DEFAULT_IDLE_TIMEOUT = 30.0
+# Seconds without a status frame before a passive fan is unavailable.
+DEFAULT_PASSIVE_STALE_TIMEOUT = 900.0
+
+# Seconds to wait for a status frame confirming a write before resending.
+DEFAULT_ACK_TIMEOUT = 1.0
+# Resends of an unconfirmed write before falling back to the reported state.
+DEFAULT_WRITE_RETRIES = 2
+
+# Bounds (seconds) of the adaptive status polling interval.
+DEFAULT_POLL_MIN_INTERVAL = 30.0
+DEFAULT_POLL_MAX_INTERVAL = 600.0
+
+# hass.data key and lifetime (seconds) of the config flow discovery index.
+DATA_DISCOVERY_CACHE = f"{DOMAIN}_discovery"
+DISCOVERY_CACHE_TTL = 60.0
+# Seconds allowed for the connection that validates a fan during setup.
+PROBE_TIMEOUT = 15.0
+
+# Storage of the last known state of every fan.
+DATA_STATE_CACHE = f"{DOMAIN}_state_cache"
+STORAGE_KEY = f"{DOMAIN}.state"
+STORAGE_VERSION = 1
+STATE_CACHE_SAVE_DELAY = 10.0
+
+# Options key enabling the protocol trace buffer.
+CONF_TRACE = "trace"
+# Frames kept by the protocol trace; older frames are dropped.
+TRACE_BUFFER_SIZE = 256
+# Options key enabling the capture file recorder.
+CONF_CAPTURE = "capture"
+
+# Command queue priorities, lower values are sent first.
+COMMAND_PRIORITY_USER = 0
+COMMAND_PRIORITY_AUTOMATION = 1
+COMMAND_PRIORITY_POLL = 2
+# Commands that may wait in a device's queue before callers are held back.
+DEFAULT_COMMAND_QUEUE_DEPTH = 8
+
+# Connect path scoring, in dB taken off a path's RSSI: per connection open,
+# active or queued on its adapter, and per consecutive failure through it.
+ADAPTER_LOAD_PENALTY = 5
+ADAPTER_FAILURE_PENALTY = 10
+# Bonus for the adapter already serving a fan, so near ties don't flap.
+ADAPTER_STICKY_BONUS = 3
+
+# hass.data key for the compiled fan scenes.
+DATA_SCENES = f"{DOMAIN}_scenes"
+# Seconds a scene warm-up may spend connecting to each fan.
+SCENE_WARM_UP_TIMEOUT = 15.0
+
+# Scene services and their fields.
+SERVICE_COMPILE_SCENE = "compile_scene"
+SERVICE_PREPARE_SCENE = "prepare_scene"
+SERVICE_ACTIVATE_SCENE = "activate_scene"
+ATTR_TARGETS = "targets"
+ATTR_TIMER = "timer"
+ATTR_AT = "at"
+
+# Storage of the GATT handles of every fan.
+DATA_GATT_CACHE = f"{DOMAIN}_gatt_cache"
+GATT_STORAGE_KEY = f"{DOMAIN}.gatt"
+
+# hass.data key for the state write batcher shared by all entities.
+DATA_STATE_WRITER = f"{DOMAIN}_state_writer"
+# Entity state changes within this window (seconds) are written together.
+STATE_WRITE_WINDOW = 0.02
+
+# hass.data key for the array-backed state of every fan.
+DATA_FLEET_STATE = f"{DOMAIN}_fleet_state"
+# Service returning the state of every fan at once.
+SERVICE_FLEET_SNAPSHOT = "fleet_snapshot"
+
+# Config entry key caching the features read from a fan's first status.
+CONF_CAPABILITIES = "capabilities"
+# hass.data key for the platforms forwarded for each config entry.
+DATA_ENTRY_PLATFORMS = f"{DOMAIN}_entry_platforms"
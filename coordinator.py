@@ -0,0 +1,98 @@
+"""Adaptive status polling for Fanimation BLE devices."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+import random
+import time
+import zlib
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DEFAULT_POLL_MAX_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+from .device import FanimationBleDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# Random spread applied to every interval so devices drift apart
+POLL_JITTER = 0.1
+# Seconds after a poll during which a status frame is taken as its reply
+POLL_REPLY_WINDOW = 5.0
+
+
+class FanimationBlePollingCoordinator:
+    """Send 0x30 status reads on an interval that adapts to the device.
+
+    The interval doubles while notifications keep arriving on their own and
+    drops back to the minimum after a write or a failed poll. Each device
+    starts at a stable offset derived from its address, so a fleet of fans
+    does not poll in the same tick.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device: FanimationBleDevice,
+        min_interval: float = DEFAULT_POLL_MIN_INTERVAL,
+        max_interval: float = DEFAULT_POLL_MAX_INTERVAL,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.device = device
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.polls = 0
+        self.skipped_polls = 0
+        self._last_tick = time.monotonic()
+        self._reply_deadline = 0.0
+        self._unsub: Callable[[], None] | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Schedule the first poll at this device's offset."""
+        offset = zlib.crc32(self.device.address.encode()) % 1000 / 1000
+        self._schedule(self.min_interval * offset)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop polling."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _schedule(self, delay: float) -> None:
+        """Schedule the next poll ``delay`` seconds from now."""
+        self._unsub = async_call_later(self.hass, delay, self._async_tick)
+
+    async def _async_tick(self, _now: datetime) -> None:
+        """Poll if needed and pick the next interval."""
+        self._unsub = None
+        device = self.device
+        last_tick = self._last_tick
+        wrote = (
+            device.last_write_time is not None and device.last_write_time > last_tick
+        )
+        # Replies to our own poll don't count as notifications flowing
+        since = max(last_tick, self._reply_deadline)
+        heard = (
+            device.last_status_time is not None and device.last_status_time > since
+        )
+        self._last_tick = time.monotonic()
+
+        if heard and not wrote:
+            # The fan reports changes on its own, so a read would add nothing
+            self.skipped_polls += 1
+            self.interval = min(self.interval * 2, self.max_interval)
+        else:
+            self.polls += 1
+            polled = await device.async_request_status()
+            self._reply_deadline = time.monotonic() + POLL_REPLY_WINDOW
+            if wrote or not polled:
+                self.interval = self.min_interval
+
+        _LOGGER.debug("Next status poll of %s in %.0fs", device.address, self.interval)
+        self._schedule(self.interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER))
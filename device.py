@@ -1,144 +1,861 @@
 """Fanimation BLE device communication."""
 import asyncio
+from collections.abc import Callable, Iterable
 import logging
+import time
 
 from bleak import BleakClient
-from bleak.exc import BleakError
+from bleak.exc import BleakCharacteristicNotFoundError, BleakError
 
-from .const import COMMAND_WRITE_UUID, STATUS_NOTIFY_UUID
+from .codec import (
+    CMD_WRITE_STATE,
+    IDX_COMMAND,
+    READ_STATUS_FRAME,
+    FanCapabilities,
+    FanStatus,
+    FrameEncoder,
+    StatusDecoder,
+)
+from .commands import CommandQueue
+from .connection import ConnectionManager, ConnectPath
+from .const import (
+    COMMAND_PRIORITY_AUTOMATION,
+    COMMAND_PRIORITY_POLL,
+    COMMAND_PRIORITY_USER,
+    COMMAND_WRITE_UUID,
+    CONNECT_PRIORITY_BACKGROUND,
+    CONNECT_PRIORITY_USER,
+    DEFAULT_ACK_TIMEOUT,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_PASSIVE_STALE_TIMEOUT,
+    DEFAULT_WRITE_DEBOUNCE,
+    DEFAULT_WRITE_MAX_DELAY,
+    DEFAULT_WRITE_RETRIES,
+    STATUS_NOTIFY_UUID,
+)
+from .fleet import DESIRED_OFFSET, ROW_SIZE, FleetStateStore
+from .gatt import GattHandles, resolve_handles
+from .metrics import DeviceMetrics, LatencyHistogram
+from .scheduler import WriteScheduler
+from .trace import TRACE_ADVERTISEMENT, TRACE_RX, TRACE_TX, ProtocolTrace
 
 _LOGGER = logging.getLogger(__name__)
 
+# Status field for each desired-state attribute
+_STATE_FIELDS = {
+    "percentage": "speed",
+    "direction": "direction",
+    "brightness": "brightness",
+    "timer_minutes": "timer_minutes",
+}
+
+# Status fields shown by each kind of entity
+FAN_FIELDS = frozenset({"speed", "direction"})
+LIGHT_FIELDS = frozenset({"brightness"})
+TIMER_FIELDS = frozenset({"timer_minutes"})
+
+
+class _DesiredField:
+    """A desired-state attribute kept in the device's fleet store row."""
+
+    __slots__ = ("_index",)
+
+    def __init__(self, field: str) -> None:
+        """Initialize the field."""
+        self._index = DESIRED_OFFSET + FanStatus._fields.index(field)
+
+    def __get__(self, device, owner=None):
+        """Return the value from the store."""
+        if device is None:
+            return self
+        return device._rows[device._row + self._index]
+
+    def __set__(self, device, value: int) -> None:
+        """Write the value to the store."""
+        device._rows[device._row + self._index] = value
+
 
 class FanimationBleDevice:
     """A wrapper for the Fanimation BLE device."""
 
-    def __init__(self, address: str):
-        """Initialize the device."""
+    __slots__ = (
+        "address",
+        "adapter",
+        "passive",
+        "idle_timeout",
+        "gatt_handles",
+        "gatt_handles_listener",
+        "capabilities",
+        "capabilities_listener",
+        "suppressed_updates",
+        "last_status_time",
+        "last_write_time",
+        "pending_fields",
+        "ack_timeout",
+        "write_retries",
+        "retried_writes",
+        "abandoned_writes",
+        "confirmation_latency",
+        "metrics",
+        "trace",
+        "command_queue",
+        "_store",
+        "_rows",
+        "_row",
+        "_status",
+        "_connections",
+        "_client_factory",
+        "_path_finder",
+        "_write_char",
+        "_notify_char",
+        "_connect_started",
+        "_connect_cached",
+        "_client",
+        "_write_sent_at",
+        "_unconfirmed_since",
+        "_retry_attempts",
+        "_ack_timer",
+        "_retry_tasks",
+        "_subscribers",
+        "_encoder",
+        "_decoder",
+        "_write_scheduler",
+        "_write_priority",
+        "_stopping",
+        "_replay_pending",
+        "_reconnect_task",
+        "_idle_timer",
+        "_idle_task",
+        "_available",
+        "_availability_subscribers",
+        "_stale_timer",
+    )
+
+    # Desired (optimistic) state; matches ``status`` once confirmed
+    percentage = _DesiredField("speed")
+    direction = _DesiredField("direction")  # 0 for forward, 1 for reverse
+    brightness = _DesiredField("brightness")
+    timer_minutes = _DesiredField("timer_minutes")
+
+    def __init__(
+        self,
+        address: str,
+        connection_manager: ConnectionManager | None = None,
+        adapter: str | None = None,
+        write_debounce: float = DEFAULT_WRITE_DEBOUNCE,
+        write_max_delay: float = DEFAULT_WRITE_MAX_DELAY,
+        passive: bool = False,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        client_factory: Callable[..., BleakClient] = BleakClient,
+        path_finder: Callable[[], list[ConnectPath]] | None = None,
+        state_store: FleetStateStore | None = None,
+    ):
+        """Initialize the device.
+
+        In passive mode state comes from advertisements, and a connection is
+        only opened to send a write and dropped after ``idle_timeout``.
+        ``client_factory`` builds the client for each connect and can be
+        replaced to run against a simulated fan. ``path_finder`` lists the
+        adapters that can currently hear the fan; the connection manager
+        picks one for every connect, otherwise ``adapter`` is used. State is
+        kept in a row of ``state_store``, shared by the whole fleet.
+        """
         self.address = address
+        self._store = FleetStateStore() if state_store is None else state_store
+        self._rows = self._store.rows
+        self._row = self._store.register(address)
+        self.adapter = adapter
+        self.passive = passive
+        self.idle_timeout = idle_timeout
+        self._connections = connection_manager or ConnectionManager()
+        self._client_factory = client_factory
+        self._path_finder = path_finder
+        # Handles from an earlier service discovery, and who to tell when
+        # they change so they can be saved
+        self.gatt_handles: GattHandles | None = None
+        self.gatt_handles_listener: Callable[[GattHandles | None], None] | None = None
+        # Features read from the first status frame, or saved from an
+        # earlier one, and who to tell when they are first read
+        self.capabilities: FanCapabilities | None = None
+        self.capabilities_listener: Callable[[FanCapabilities], None] | None = None
+        self._write_char: int | str = COMMAND_WRITE_UUID
+        self._notify_char: int | str = STATUS_NOTIFY_UUID
+        # Start of the current connect and whether it used cached handles,
+        # until the first notification arrives
+        self._connect_started: float | None = None
+        self._connect_cached = False
         self._client: BleakClient | None = None
-        self.is_on = False
-        self.light_is_on = False
-        self.percentage = 0
-        self.brightness = 0
-        self.direction = 0  # 0 for forward, 1 for reverse
-        self.timer_minutes = 0
-        self._update_callback = None
-
-    def register_callback(self, callback) -> None:
-        """Register a callback to be called when the state changes."""
-        self._update_callback = callback
+        # Last state reported by the fan; the row starts zeroed
+        self._status = FanStatus(0, 0, 0, 0)
+        self.suppressed_updates = 0
+        # Monotonic times of the last valid status frame and state write
+        self.last_status_time: float | None = None
+        self.last_write_time: float | None = None
+        # Fields changed locally that no status frame has confirmed yet
+        self.pending_fields: frozenset[str] = frozenset()
+        self.ack_timeout = DEFAULT_ACK_TIMEOUT
+        self.write_retries = DEFAULT_WRITE_RETRIES
+        self.retried_writes = 0
+        self.abandoned_writes = 0
+        self.confirmation_latency = LatencyHistogram()
+        self.metrics = DeviceMetrics()
+        self.trace = ProtocolTrace(address)
+        # Monotonic time of a state write still waiting for a status frame
+        self._write_sent_at: float | None = None
+        self._unconfirmed_since: float | None = None
+        self._retry_attempts = 0
+        self._ack_timer: asyncio.TimerHandle | None = None
+        self._retry_tasks: set[asyncio.Task] = set()
+        self._subscribers: dict[str, list[Callable[[frozenset[str]], None]]] = {
+            field: [] for field in FanStatus._fields
+        }
+        # Availability last announced to subscribers
+        self._available = False
+        self._availability_subscribers: list[Callable[[], None]] = []
+        self._stale_timer: asyncio.TimerHandle | None = None
+        self._encoder = FrameEncoder()
+        self._decoder = StatusDecoder()
+        self._write_scheduler = WriteScheduler(
+            self._async_write_state, write_debounce, write_max_delay
+        )
+        self.command_queue = CommandQueue()
+        # Most urgent priority among the writes merged into the next frame
+        self._write_priority = COMMAND_PRIORITY_AUTOMATION
+        self._stopping = False
+        self._replay_pending = False
+        self._reconnect_task: asyncio.Task | None = None
+        self._idle_timer: asyncio.TimerHandle | None = None
+        self._idle_task: asyncio.Task | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true if there is a live connection to the fan."""
+        return self._client is not None and self._client.is_connected
+
+    @property
+    def available(self) -> bool:
+        """Return true if the state shown is current.
+
+        Passive fans only connect to write, so they count as available while
+        their advertisements keep arriving.
+        """
+        if not self.passive:
+            return self.is_connected
+        return (
+            self.last_status_time is not None
+            and time.monotonic() - self.last_status_time
+            < DEFAULT_PASSIVE_STALE_TIMEOUT
+        )
+
+    def async_subscribe_availability(
+        self, callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Call ``callback`` when ``available`` changes; returns an unsubscribe."""
+        self._availability_subscribers.append(callback)
+        return lambda: self._availability_subscribers.remove(callback)
+
+    def _update_available(self) -> None:
+        """Tell subscribers if ``available`` changed."""
+        if (available := self.available) == self._available:
+            return
+        self._available = available
+        for callback in list(self._availability_subscribers):
+            callback()
+
+    def _check_stale(self) -> None:
+        """Mark a passive fan unavailable once its advertisements stop."""
+        self._stale_timer = None
+        if self.available:
+            remaining = DEFAULT_PASSIVE_STALE_TIMEOUT - (
+                time.monotonic() - self.last_status_time
+            )
+            self._stale_timer = asyncio.get_running_loop().call_later(
+                remaining, self._check_stale
+            )
+            return
+        self._update_available()
+
+    @property
+    def is_on(self) -> bool:
+        """Return true if the fan is (or is being turned) on."""
+        return self.percentage > 0
+
+    @property
+    def light_is_on(self) -> bool:
+        """Return true if the light is (or is being turned) on."""
+        return self.brightness > 0
+
+    @property
+    def status(self) -> FanStatus:
+        """Return the last state reported by the fan."""
+        return self._status
+
+    @status.setter
+    def status(self, status: FanStatus) -> None:
+        """Record a reported state in the store."""
+        self._status = status
+        self._rows[self._row : self._row + DESIRED_OFFSET] = bytes(status)
+
+    @property
+    def desired(self) -> FanStatus:
+        """Return the state most recently requested, confirmed or not."""
+        start = self._row + DESIRED_OFFSET
+        return FanStatus(*self._rows[start : start + DESIRED_OFFSET])
+
+    def is_confirmed(self, fields: Iterable[str] = FanStatus._fields) -> bool:
+        """Return true if the fan has reported every change to ``fields``."""
+        return self.pending_fields.isdisjoint(fields)
+
+    @property
+    def coalesced_writes(self) -> int:
+        """Return how many requested writes were merged into another frame."""
+        return self._write_scheduler.coalesced
+
+    def async_subscribe(
+        self,
+        callback: Callable[[frozenset[str]], None],
+        fields: Iterable[str] = FanStatus._fields,
+    ) -> Callable[[], None]:
+        """Call ``callback`` when any of ``fields`` changes.
+
+        The callback receives the set of status fields that changed. Returns
+        a function that removes the subscription.
+        """
+        fields = frozenset(fields)
+        for field in fields:
+            self._subscribers[field].append(callback)
+
+        def _unsubscribe() -> None:
+            for field in fields:
+                self._subscribers[field].remove(callback)
+
+        return _unsubscribe
 
     def _notification_handler(self, sender: int, data: bytearray):
         """Handle notification responses."""
-        _LOGGER.debug("Received notification: %s", data.hex())
-
-        # Verify checksum of received data
-        if len(data) != 10 or (sum(data[:-1]) & 0xFF) != data[9]:
+        # Runs for every frame; format nothing unless someone is listening
+        if self.trace.enabled:
+            self.trace.record(TRACE_RX, data)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Received notification from %s: %s", self.address, data.hex())
+        if self._connect_started is not None:
+            self._record_connect_to_status()
+        if not self._process_status(data):
+            self.metrics.invalid_frames += 1
             _LOGGER.warning(
-                "Received notification with invalid checksum or length: %s", data.hex()
+                "Received notification with invalid checksum or length from %s: %s",
+                self.address,
+                data.hex(),
+            )
+
+    def _record_connect_to_status(self) -> None:
+        """Measure the time from starting a connect to its first notification."""
+        elapsed = time.monotonic() - self._connect_started
+        if self._connect_cached:
+            self.metrics.connect_to_status_cached.record(elapsed)
+        else:
+            self.metrics.connect_to_status.record(elapsed)
+        self._connect_started = None
+
+    def handle_advertisement(self, data: bytes) -> bool:
+        """Update the state from a status frame carried in an advertisement.
+
+        Returns False if ``data`` is not a valid status frame.
+        """
+        if self.trace.enabled:
+            self.trace.record(TRACE_ADVERTISEMENT, data)
+        return self._process_status(data)
+
+    def _process_status(self, data) -> bool:
+        """Decode a status frame and dispatch any changed fields."""
+        status = self._decoder.decode(data)
+        if status is None:
+            return False
+        if self.capabilities is None:
+            self.capabilities = FanCapabilities.from_frame(data)
+            if self.capabilities_listener is not None:
+                self.capabilities_listener(self.capabilities)
+        self.last_status_time = time.monotonic()
+        if self.passive:
+            if not self._available:
+                self._update_available()
+            if self._stale_timer is None:
+                self._stale_timer = asyncio.get_running_loop().call_later(
+                    DEFAULT_PASSIVE_STALE_TIMEOUT, self._check_stale
+                )
+        self.metrics.status_frames += 1
+        if self._write_sent_at is not None:
+            self.metrics.write_to_notify.record(
+                self.last_status_time - self._write_sent_at
             )
+            self._write_sent_at = None
+
+        if self.pending_fields:
+            self.status = status
+            if status != self.desired:
+                # An older frame; keep showing the state that was asked for
+                return True
+            self._confirm()
+            return True
+
+        # The decoder hands back the same object for a repeated frame
+        if status is self.status or status == self.status:
+            self.suppressed_updates += 1
+            return True
+
+        self.status = status
+        self._dispatch(self._set_desired(status))
+        return True
+
+    def _set_desired(self, state: FanStatus) -> frozenset[str]:
+        """Make ``state`` the desired state and return the fields that changed."""
+        changed = frozenset(
+            field
+            for field, old, new in zip(FanStatus._fields, self.desired, state)
+            if old != new
+        )
+        start = self._row + DESIRED_OFFSET
+        self._rows[start : start + DESIRED_OFFSET] = bytes(state)
+        return changed
+
+    def _dispatch(self, changed: frozenset[str]) -> None:
+        """Call every subscriber interested in ``changed``."""
+        # A subscriber interested in several changed fields is called once
+        callbacks = dict.fromkeys(
+            callback for field in changed for callback in self._subscribers[field]
+        )
+        for callback in callbacks:
+            callback(changed)
+
+    def _request_state(self, **changes: int) -> frozenset[str]:
+        """Update the desired state optimistically and mark it unconfirmed."""
+        changed = frozenset(
+            field for field, value in changes.items() if getattr(self, field) != value
+        )
+        for field, value in changes.items():
+            setattr(self, field, value)
+        # Attribute names differ from the status frame field names
+        changed = frozenset(_STATE_FIELDS[field] for field in changed)
+        if changed:
+            # A new request gets a fresh retry budget
+            self._retry_attempts = 0
+            self.pending_fields |= changed
+            self._dispatch(changed)
+        return changed
+
+    def _confirm(self) -> None:
+        """Mark the desired state as reported by the fan."""
+        if self._unconfirmed_since is not None:
+            self.confirmation_latency.record(time.monotonic() - self._unconfirmed_since)
+        self._cancel_ack_timer()
+        changed, self.pending_fields = self.pending_fields, frozenset()
+        self._dispatch(changed)
+
+    def _cancel_ack_timer(self) -> None:
+        """Stop waiting for a confirmation."""
+        if self._ack_timer is not None:
+            self._ack_timer.cancel()
+            self._ack_timer = None
+        self._unconfirmed_since = None
+        self._retry_attempts = 0
+
+    def _on_write_sent(self) -> None:
+        """Start waiting for the fan to confirm a state write."""
+        if not self.pending_fields:
             return
-        
-        # Assuming the notification format matches the command structure
-        # Byte 0 should be 0x53, Byte 1 should be command type
-        self.percentage = data[2]
-        self.is_on = self.percentage > 0
-        self.direction = data[3]
-        # Byte 4 (index 4) is constant 0
-        self.brightness = data[5]
-        self.light_is_on = self.brightness > 0
-        self.timer_minutes = data[6]
-        # Byte 7 (index 7) is constant 0
-        # Byte 8 (index 8) is likely constant 0
-
-        if self._update_callback:
-            self._update_callback()
-
-    def _compute_checksum(self, payload: bytearray) -> int:
-        """Compute the checksum for a command payload."""
-        return sum(payload) & 0xFF
-
-    def _create_command_packet(self, command_type: int) -> bytearray:
-        """Creates a 10-byte command packet."""
-        payload = bytearray(9)  # Create a 9-byte array, checksum will be 10th
-        payload[0] = 0x53
-        payload[1] = command_type
-
-        if command_type == 0x31:  # Write command
-            payload[2] = self.percentage
-            payload[3] = self.direction
-            payload[4] = 0  # Constant
-            payload[5] = self.brightness
-            payload[6] = self.timer_minutes
-            payload[7] = 0  # Constant
-            payload[8] = 0  # Constant
-        # For a read command (0x30), bytes 2-8 are already initialized to 0
-
-        checksum = sum(payload) & 0xFF
-        return payload + bytearray([checksum])
-
-    async def _send_command(self, command: bytearray):
-        """Writes a command to the BLE characteristic."""
-        if not self._client or not self._client.is_connected:
-            _LOGGER.warning("Attempted to write when not connected.")
+        if self._unconfirmed_since is None:
+            self._unconfirmed_since = time.monotonic()
+        if self._ack_timer is not None:
+            self._ack_timer.cancel()
+        self._ack_timer = asyncio.get_running_loop().call_later(
+            self.ack_timeout, self._on_ack_timeout
+        )
+
+    def _on_ack_timeout(self) -> None:
+        """Retry an unconfirmed write, or give up and show the reported state."""
+        self._ack_timer = None
+        if not self.pending_fields:
             return
+        if self._retry_attempts < self.write_retries:
+            self._retry_attempts += 1
+            self.retried_writes += 1
+            _LOGGER.debug(
+                "Write to %s not confirmed, retry %d", self.address, self._retry_attempts
+            )
+            task = asyncio.create_task(self._write_scheduler.async_request_write())
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+            return
+
+        _LOGGER.warning(
+            "Fan %s did not confirm %s, showing its reported state",
+            self.address,
+            ", ".join(sorted(self.pending_fields)),
+        )
+        self.abandoned_writes += 1
+        pending, self.pending_fields = self.pending_fields, frozenset()
+        self._cancel_ack_timer()
+        # Fields that were pending change their confirmed flag too
+        self._dispatch(self._set_desired(self.status) | pending)
+
+    async def _send_command(self, command: bytes | bytearray) -> bool:
+        """Writes a command to the BLE characteristic.
+
+        Returns True if the command was handed to the adapter.
+        """
+        if (not self._client or not self._client.is_connected) and self.passive:
+            # This write carries the latest state, so nothing is left to replay
+            self._replay_pending = False
+            if not await self.connect(CONNECT_PRIORITY_USER):
+                return False
+        if not self._client or not self._client.is_connected:
+            if command[IDX_COMMAND] == CMD_WRITE_STATE:
+                # Only the newest desired state matters, so a flag is enough
+                self._replay_pending = True
+                _LOGGER.debug(
+                    "Not connected to %s, write will be replayed on reconnect",
+                    self.address,
+                )
+            else:
+                _LOGGER.debug("Not connected to %s, skipping status read", self.address)
+            self._start_reconnect()
+            return False
+        if self.trace.enabled:
+            self.trace.record(TRACE_TX, command)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Sending command to %s: %s", self.address, command.hex())
+        start = time.monotonic()
         try:
-            _LOGGER.debug("Sending command: %s", command.hex())
             await self._client.write_gatt_char(
-                COMMAND_WRITE_UUID, command, response=False
+                self._write_char, command, response=False
             )
         except BleakError as e:
+            self.metrics.write_errors += 1
+            if command[IDX_COMMAND] == CMD_WRITE_STATE:
+                self._replay_pending = True
+            if isinstance(e, BleakCharacteristicNotFoundError):
+                # Fall back to looking the characteristic up by UUID
+                self._set_gatt_handles(None)
+                self._write_char = COMMAND_WRITE_UUID
             _LOGGER.error(
                 "Error writing to characteristic %s: %s", COMMAND_WRITE_UUID, e
             )
+            return False
+        self.metrics.writes += 1
+        self.metrics.write_time.record(time.monotonic() - start)
+        if self.passive:
+            self._schedule_idle_disconnect()
+        return True
+
+    def _schedule_idle_disconnect(self) -> None:
+        """(Re)start the timer that drops an on-demand connection."""
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        self._idle_timer = asyncio.get_running_loop().call_later(
+            self.idle_timeout, self._idle_disconnect
+        )
+
+    def _idle_disconnect(self) -> None:
+        """Drop the connection after it has been idle."""
+        self._idle_timer = None
+        if self._client and self._client.is_connected:
+            _LOGGER.debug("Dropping idle connection to %s", self.address)
+            self._idle_task = asyncio.create_task(self._client.disconnect())
+
+    def _on_disconnected(self, client: BleakClient) -> None:
+        """Handle the link dropping."""
+        if client is not self._client:
+            return
+        self._connections.record_disconnect(self.address)
+        self._update_available()
+        if self._stopping:
+            return
+        self.metrics.disconnects += 1
+        if self.passive and not self._replay_pending:
+            # Passive devices connect again on the next write
+            return
+        _LOGGER.warning("Disconnected from %s, reconnecting", self.address)
+        self._start_reconnect()
+
+    def _start_reconnect(self, priority: int = CONNECT_PRIORITY_BACKGROUND) -> None:
+        """Start the reconnect supervisor unless it is already running."""
+        if self._stopping or (
+            self._reconnect_task is not None and not self._reconnect_task.done()
+        ):
+            return
+        self._reconnect_task = asyncio.create_task(self._async_reconnect(priority))
+
+    def start_connecting(self, priority: int = CONNECT_PRIORITY_BACKGROUND) -> None:
+        """Connect in the background, retrying with backoff until it succeeds."""
+        self._stopping = False
+        self._start_reconnect(priority)
+
+    def release_state(self) -> None:
+        """Move the state out of the shared store into a private row.
+
+        Called before the store row is given up, so callbacks that still
+        reach this device can't write into a row another fan reuses.
+        """
+        row = self._rows[self._row : self._row + ROW_SIZE]
+        self._store.unregister(self.address)
+        self._store = FleetStateStore()
+        self._rows = self._store.rows
+        self._row = self._store.register(self.address)
+        self._rows[self._row : self._row + ROW_SIZE] = row
+
+    def restore_state(self, status: FanStatus) -> None:
+        """Seed the reported and desired state from a saved status."""
+        self.status = status
+        self._set_desired(status)
+
+    async def _async_reconnect(self, priority: int) -> None:
+        """Reconnect until the link is back, waiting out the backoff between tries."""
+        attempt = 0
+        while not self._stopping and not (
+            self._client and self._client.is_connected
+        ):
+            attempt += 1
+            _LOGGER.debug("Reconnect attempt %d to %s", attempt, self.address)
+            # A pending user write jumps the queue for a connect slot
+            if await self.connect(
+                CONNECT_PRIORITY_USER if self._replay_pending else priority
+            ):
+                return
+
+    async def _async_write_state(self) -> bool:
+        """Queue a write of the current desired state."""
+        priority = self._write_priority
+        # Retries and replays that follow go out as background writes
+        self._write_priority = COMMAND_PRIORITY_AUTOMATION
+        return await self.command_queue.async_submit(self._async_send_state, priority)
+
+    async def _async_send_state(self) -> bool:
+        """Send the current desired state as a single 0x31 frame."""
+        # Encoded when sent, not when queued, so the newest state goes out
+        return await self._async_send_frame(
+            self._encoder.encode(
+                self.percentage, self.direction, self.brightness, self.timer_minutes
+            )
+        )
 
+    async def _async_send_frame(self, command: bytes | bytearray) -> bool:
+        """Send a 0x31 frame and start waiting for its confirmation."""
+        self.last_write_time = time.monotonic()
+        if written := await self._send_command(command):
+            self._write_sent_at = time.monotonic()
+        elif self._replay_pending and not self.passive and not self.is_connected:
+            # The reconnect replays this state and starts waiting then
+            return False
+        # Any other write that couldn't be sent spends the same retry budget
+        # as one the fan didn't confirm, then falls back to the reported state
+        self._on_write_sent()
+        return written
 
-    async def connect(self) -> bool:
+    async def connect(self, priority: int = CONNECT_PRIORITY_BACKGROUND) -> bool:
         """Connect to the BLE device."""
-        self._client = BleakClient(self.address)
-        try:
-            await self._client.connect()
-            await self._client.start_notify(
-                STATUS_NOTIFY_UUID, self._notification_handler
+        target = self.address
+        if self._path_finder is not None and (
+            path := self._connections.choose_path(self.address, self._path_finder())
+        ):
+            self.adapter = path.adapter
+            target = path.target
+        async with self._connections.async_connect_slot(
+            self.address, self.adapter, priority
+        ):
+            # Only start_connecting() undoes a disconnect()
+            if self._stopping:
+                return False
+            client = self._client = self._client_factory(
+                target, disconnected_callback=self._on_disconnected
             )
+            start = time.monotonic()
+            handles = self.gatt_handles
+            try:
+                # Having seen the fan's services before, let the backend
+                # reuse its own GATT cache instead of discovering again
+                await client.connect(dangerous_use_bleak_cache=handles is not None)
+                await self._async_start_notify(client, handles)
+            except (BleakError, asyncio.TimeoutError) as e:
+                self.metrics.connect_failures += 1
+                delay = self._connections.record_failure(self.address, self.adapter)
+                _LOGGER.error(
+                    "Failed to connect to %s: %s (next attempt in %.1fs)",
+                    self.address,
+                    e,
+                    delay,
+                )
+                if self._client is client:
+                    self._client = None
+                return False
+            if self._stopping:
+                # disconnect() ran while the link was coming up and found
+                # nothing to close
+                await client.disconnect()
+                if self._client is client:
+                    self._client = None
+                return False
+            self.metrics.connects += 1
+            self.metrics.connect_time.record(time.monotonic() - start)
+            self._connect_started = start
+            # Stale handles were dropped, so this counts as a discovery
+            self._connect_cached = handles is not None and handles == self.gatt_handles
+
+        self._connections.record_success(self.address, self.adapter)
+        self._update_available()
+        if self._replay_pending:
+            self._replay_pending = False
+            _LOGGER.debug("Replaying desired state to %s", self.address)
+            await self._write_scheduler.async_request_write()
+        if self.passive:
+            # Advertisements carry the state, so don't pay for a status read
+            self._schedule_idle_disconnect()
+        else:
             await self.async_request_status()
-            _LOGGER.info("Connected to %s", self.address)
-            return True
-        except (BleakError, asyncio.TimeoutError) as e:
-            _LOGGER.error("Failed to connect to %s: %s", self.address, e)
-            self._client = None
-            return False
+        _LOGGER.info("Connected to %s through %s", self.address, self.adapter)
+        return True
+
+    async def _async_start_notify(
+        self, client: BleakClient, handles: GattHandles | None
+    ) -> None:
+        """Subscribe to status notifications, by handle if it is known."""
+        # After a firmware update a cached handle may name another attribute
+        # that still exists, so check them against the services first
+        if handles is not None and resolve_handles(client.services) != handles:
+            _LOGGER.debug("Cached handles of %s are stale", self.address)
+            self._set_gatt_handles(None)
+        elif handles is not None:
+            try:
+                await client.start_notify(handles.notify, self._notification_handler)
+            except BleakError as err:
+                _LOGGER.debug("Cached handles of %s failed: %s", self.address, err)
+                self._set_gatt_handles(None)
+            else:
+                self._write_char = handles.write
+                self._notify_char = handles.notify
+                return
+
+        await client.start_notify(STATUS_NOTIFY_UUID, self._notification_handler)
+        self._write_char = COMMAND_WRITE_UUID
+        self._notify_char = STATUS_NOTIFY_UUID
+        self._set_gatt_handles(resolve_handles(client.services))
+
+    def _set_gatt_handles(self, handles: GattHandles | None) -> None:
+        """Remember newly resolved handles, or forget stale ones."""
+        if handles == self.gatt_handles:
+            return
+        self.gatt_handles = handles
+        if self.gatt_handles_listener is not None:
+            self.gatt_handles_listener(handles)
 
     async def disconnect(self):
         """Disconnect from the BLE device."""
+        self._stopping = True
+        # Nothing sent now could be confirmed before the link goes down
+        self._write_scheduler.cancel()
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        if self._stale_timer is not None:
+            self._stale_timer.cancel()
+            self._stale_timer = None
+        self._cancel_ack_timer()
+        self.command_queue.clear()
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
         if self._client and self._client.is_connected:
             try:
-                await self._client.stop_notify(STATUS_NOTIFY_UUID)
+                await self._client.stop_notify(self._notify_char)
             except BleakError as e:
                 _LOGGER.warning("Failed to stop notifications: %s", e)
             await self._client.disconnect()
+        self._connections.record_disconnect(self.address)
         self._client = None
+        self._update_available()
+
+    async def apply_state(
+        self,
+        speed: int | None = None,
+        direction: int | None = None,
+        brightness: int | None = None,
+        timer: int | None = None,
+        priority: int = COMMAND_PRIORITY_USER,
+    ) -> bool:
+        """Change any combination of fields with a single 0x31 write.
+
+        Fields left as None keep their current desired value. ``priority``
+        places the write in the command queue.
+        """
+        changes = {
+            attr: value
+            for attr, value in (
+                ("percentage", speed),
+                ("direction", direction),
+                ("brightness", brightness),
+                ("timer_minutes", timer),
+            )
+            if value is not None
+        }
+        self._request_state(**changes)
+        self._write_priority = min(self._write_priority, priority)
+        return await self._write_scheduler.async_request_write()
 
-    async def set_fan_speed(self, percentage: int):
+    async def async_send_compiled(
+        self,
+        state: FanStatus,
+        frame: bytes,
+        priority: int = COMMAND_PRIORITY_USER,
+    ) -> bool:
+        """Make ``state`` the desired state and send its pre-encoded ``frame``.
+
+        Skips the write debounce, so the frame goes out as soon as the
+        command queue allows. ``frame`` must be the encoding of ``state``.
+        """
+        self._request_state(
+            percentage=state.speed,
+            direction=state.direction,
+            brightness=state.brightness,
+            timer_minutes=state.timer_minutes,
+        )
+        return await self.command_queue.async_submit(
+            lambda: self._async_send_frame(frame), priority
+        )
+
+    async def async_warm_up(self) -> bool:
+        """Connect now so an upcoming write doesn't wait for the link."""
+        if self.is_connected:
+            if self.passive:
+                # Keep the on-demand link until the write arrives
+                self._schedule_idle_disconnect()
+            return True
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            # Wait for the running reconnect rather than racing it
+            await asyncio.shield(self._reconnect_task)
+            return self.is_connected
+        return await self.connect(CONNECT_PRIORITY_USER)
+
+    async def set_fan_speed(self, percentage: int) -> bool:
         """Set the fan speed."""
-        self.percentage = percentage
-        command = self._create_command_packet(0x31)
-        await self._send_command(command)
+        return await self.apply_state(speed=percentage)
 
-    async def set_light_brightness(self, brightness: int):
+    async def set_light_brightness(self, brightness: int) -> bool:
         """Set the light brightness."""
-        self.brightness = brightness
-        command = self._create_command_packet(0x31)
-        await self._send_command(command)
+        return await self.apply_state(brightness=brightness)
 
-    async def set_direction(self, direction: int):
+    async def set_direction(self, direction: int) -> bool:
         """Set the fan direction."""
-        self.direction = direction
-        command = self._create_command_packet(0x31)
-        await self._send_command(command)
+        return await self.apply_state(direction=direction)
+
+    async def set_timer(self, minutes: int) -> bool:
+        """Set the timer."""
+        return await self.apply_state(timer=minutes)
 
-    async def async_request_status(self):
+    async def async_request_status(self, priority: int = COMMAND_PRIORITY_POLL) -> bool:
         """Request a status update from the device."""
-        command = self._create_command_packet(0x30)
-        await self._send_command(command)
\ No newline at end of file
+        return await self.command_queue.async_submit(
+            self._async_send_status_request, priority, poll=True
+        )
+
+    async def _async_send_status_request(self) -> bool:
+        """Send a 0x30 status request."""
+        return await self._send_command(READ_STATUS_FRAME)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""Diagnostics support for Fanimation BLE."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .connection import ConnectionManager
+from .const import DATA_CONNECTION_MANAGER, DATA_STATE_WRITER, DOMAIN
+from .device import FanimationBleDevice
+from .group import FanimationBleGroup
+
+
+def _device_diagnostics(device: FanimationBleDevice) -> dict[str, Any]:
+    """Return the state and measurements of one device."""
+    return {
+        "address": device.address,
+        "adapter": device.adapter,
+        "passive": device.passive,
+        "connected": device.is_connected,
+        "desired": device.desired._asdict(),
+        "status": device.status._asdict(),
+        "pending_fields": sorted(device.pending_fields),
+        "suppressed_updates": device.suppressed_updates,
+        "coalesced_writes": device.coalesced_writes,
+        "retried_writes": device.retried_writes,
+        "abandoned_writes": device.abandoned_writes,
+        "confirmation_latency": device.confirmation_latency.as_dict(),
+        "metrics": device.metrics.as_dict(),
+        "command_queue": {
+            "queued": len(device.command_queue),
+            "dropped_polls": device.command_queue.dropped_polls,
+            "wait_time": device.command_queue.wait_time.as_dict(),
+        },
+        "trace": device.trace.as_list(),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: FanimationBleDevice | FanimationBleGroup = hass.data[DOMAIN][entry.entry_id]
+    connection_manager: ConnectionManager | None = hass.data.get(
+        DATA_CONNECTION_MANAGER
+    )
+    diagnostics: dict[str, Any] = {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "adapters": connection_manager.adapter_usage() if connection_manager else {},
+    }
+    if (state_writer := hass.data.get(DATA_STATE_WRITER)) is not None:
+        diagnostics["state_writes"] = state_writer.as_dict()
+    if isinstance(data, FanimationBleGroup):
+        diagnostics["members"] = [
+            _device_diagnostics(device) for device in data.devices
+        ]
+        diagnostics["last_results"] = [asdict(result) for result in data.last_results]
+    else:
+        diagnostics["device"] = _device_diagnostics(data)
+        if connection_manager is not None:
+            diagnostics["device"]["backoff_remaining"] = (
+                connection_manager.backoff_remaining(data.address)
+            )
+            diagnostics["device"]["assigned_adapter"] = (
+                connection_manager.assignments.get(data.address)
+            )
+    return diagnostics
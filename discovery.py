@@ -0,0 +1,105 @@
+"""Discovery of Fanimation BLE fans for the config flow."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+
+from bleak import BleakClient
+from bleak.exc import BleakError
+
+from homeassistant.components import bluetooth
+from homeassistant.core import HomeAssistant, callback
+
+from .connection import ConnectionManager
+from .const import (
+    COMMAND_WRITE_UUID,
+    CONNECT_PRIORITY_USER,
+    DATA_CONNECTION_MANAGER,
+    DATA_DISCOVERY_CACHE,
+    DISCOVERY_CACHE_TTL,
+    FANIMATION_SERVICE_UUID,
+    PROBE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DiscoveredFan:
+    """Metadata of a fan seen advertising the Fanimation service."""
+
+    address: str
+    name: str
+    rssi: int
+    source: str
+
+
+@dataclass
+class _DiscoveryCache:
+    """Fans indexed by address, with the time the index was built."""
+
+    fans: dict[str, DiscoveredFan]
+    built: float
+
+
+@callback
+def async_discovered_fans(
+    hass: HomeAssistant, exclude: set[str] | frozenset[str] = frozenset()
+) -> dict[str, DiscoveredFan]:
+    """Return discovered fans by address, leaving out ``exclude``.
+
+    The index is rebuilt from the bluetooth integration's discoveries at most
+    once per DISCOVERY_CACHE_TTL, so repeated flows reuse it.
+    """
+    cache: _DiscoveryCache | None = hass.data.get(DATA_DISCOVERY_CACHE)
+    if cache is None or time.monotonic() - cache.built > DISCOVERY_CACHE_TTL:
+        fans = {
+            info.address: DiscoveredFan(
+                info.address, info.name or info.address, info.rssi, info.source
+            )
+            for info in bluetooth.async_discovered_service_info(hass)
+            if FANIMATION_SERVICE_UUID in info.service_uuids
+        }
+        cache = hass.data[DATA_DISCOVERY_CACHE] = _DiscoveryCache(
+            fans, time.monotonic()
+        )
+    return {
+        address: fan for address, fan in cache.fans.items() if address not in exclude
+    }
+
+
+async def _async_probe(
+    hass: HomeAssistant, manager: ConnectionManager, fan: DiscoveredFan
+) -> bool:
+    """Connect to ``fan`` briefly and check it has the command characteristic."""
+    ble_device = bluetooth.async_ble_device_from_address(
+        hass, fan.address, connectable=True
+    )
+    if ble_device is None:
+        return False
+    async with manager.async_connect_slot(
+        fan.address, fan.source, CONNECT_PRIORITY_USER
+    ):
+        client = BleakClient(ble_device, timeout=PROBE_TIMEOUT)
+        try:
+            await client.connect()
+            return client.services.get_characteristic(COMMAND_WRITE_UUID) is not None
+        except (BleakError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Probe of %s failed: %s", fan.address, err)
+            return False
+        finally:
+            if client.is_connected:
+                await client.disconnect()
+
+
+async def async_probe_fans(
+    hass: HomeAssistant, fans: list[DiscoveredFan]
+) -> dict[str, bool]:
+    """Probe ``fans`` concurrently and return the result by address."""
+    manager: ConnectionManager = hass.data.setdefault(
+        DATA_CONNECTION_MANAGER, ConnectionManager()
+    )
+    results = await asyncio.gather(*(_async_probe(hass, manager, fan) for fan in fans))
+    return {fan.address: ok for fan, ok in zip(fans, results)}
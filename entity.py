@@ -1,31 +1,90 @@
 """Base entity for Fanimation BLE."""
+from typing import Any
+
+from homeassistant.core import Context, callback
 from homeassistant.helpers.entity import DeviceInfo, Entity
 
-from .const import DOMAIN
+from .const import COMMAND_PRIORITY_AUTOMATION, COMMAND_PRIORITY_USER, DOMAIN
 from .device import FanimationBleDevice
+from .state_writer import async_get_state_writer
+
+
+def command_priority(context: Context | None) -> int:
+    """Return the command queue priority for a service call's context."""
+    # Calls made by a person carry their user id; automations don't
+    if context is not None and context.user_id is not None:
+        return COMMAND_PRIORITY_USER
+    return COMMAND_PRIORITY_AUTOMATION
 
 
 class FanimationBleEntity(Entity):
     """Representation of a Fanimation BLE entity."""
 
-    def __init__(self, device: FanimationBleDevice, name: str, unique_id_suffix: str):
-        """Initialize the entity."""
+    _attr_should_poll = False
+    # Status fields this entity shows; other changes don't update its state
+    _device_fields: frozenset[str] = frozenset()
+
+    def __init__(
+        self,
+        device: FanimationBleDevice,
+        device_name: str,
+        name: str,
+        unique_id_suffix: str,
+    ):
+        """Initialize the entity.
+
+        ``device_name`` names the fan itself and is the same for all of its
+        entities, usually the config entry title.
+        """
         self._device = device
         self._attr_name = name
         self._attr_unique_id = f"{device.address}_{unique_id_suffix}"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, device.address)},
-            name=name,
+            name=device_name,
             manufacturer="Fanimation",
-            model="Smart Fan",
+            model=(
+                "Smart Fan"
+                if device.capabilities is None
+                else device.capabilities.model
+            ),
         )
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
-        self._device.register_callback(self.async_write_ha_state)
+        self._state_writer = async_get_state_writer(self.hass)
+        self.async_on_remove(
+            self._device.async_subscribe(
+                self._handle_device_update, self._device_fields
+            )
+        )
+        self.async_on_remove(
+            self._device.async_subscribe_availability(self._handle_availability)
+        )
+        self.async_on_remove(lambda: self._state_writer.async_discard(self))
+
+    @property
+    def available(self) -> bool:
+        """Return true if the fan is connected or, if passive, still heard."""
+        return self._device.available
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return whether the fan has confirmed the state shown."""
+        return {"confirmed": self._device.is_confirmed(self._device_fields)}
+
+    @property
+    def _command_priority(self) -> int:
+        """Return the queue priority for the service call being handled."""
+        return command_priority(self._context)
+
+    @callback
+    def _handle_availability(self) -> None:
+        """Queue a state write after the fan became (un)available."""
+        self._state_writer.async_schedule(self)
 
-    async def async_will_remove_from_hass(self) -> None:
-        """When entity will be removed from hass."""
-        await super().async_will_remove_from_hass()
-        self._device.register_callback(None)
\ No newline at end of file
+    @callback
+    def _handle_device_update(self, changed: frozenset[str]) -> None:
+        """Queue a state write after a field shown by this entity changed."""
+        self._state_writer.async_schedule(self)
@@ -1,11 +1,13 @@
 """Fan platform for Fanimation BLE."""
 from __future__ import annotations
 
+from collections.abc import Callable
 from typing import Any, Optional
 
 from homeassistant.components.fan import FanEntity, FanEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util.percentage import (
     int_states_in_range,
@@ -13,12 +15,35 @@ from homeassistant.util.percentage import (
     ranged_value_to_percentage,
 )
 
-from .const import DOMAIN
-from .device import FanimationBleDevice
-from .entity import FanimationBleEntity
+from .const import DOMAIN, SIGNAL_DEVICES_CHANGED
+from .device import FAN_FIELDS, FanimationBleDevice
+from .entity import FanimationBleEntity, command_priority
+from .group import FanimationBleGroup
+from .state_writer import async_get_state_writer
 
 SPEED_RANGE = (1, 31)  # The fan uses a 1-31 speed range
 
+SUPPORTED_FEATURES = (
+    FanEntityFeature.SET_SPEED
+    | FanEntityFeature.DIRECTION
+    | FanEntityFeature.TURN_ON
+    | FanEntityFeature.TURN_OFF
+)
+
+
+def percentage_to_speed(percentage: int) -> int:
+    """Convert a percentage to the fan's native speed value."""
+    if percentage == 0:
+        return 0
+    return int(round(percentage_to_ranged_value(SPEED_RANGE, percentage)))
+
+
+def speed_to_percentage(speed: int | None) -> int:
+    """Convert the fan's native speed value to a percentage."""
+    if not speed:
+        return 0
+    return ranged_value_to_percentage(SPEED_RANGE, speed)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -26,23 +51,28 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the fan entity."""
-    device: FanimationBleDevice = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([FanimationBleFanEntity(device)])
+    data: FanimationBleDevice | FanimationBleGroup = hass.data[DOMAIN][entry.entry_id]
+    if isinstance(data, FanimationBleGroup):
+        async_add_entities(
+            [FanimationBleGroupFanEntity(data, entry.title, entry.entry_id)]
+        )
+        return
+    async_add_entities([FanimationBleFanEntity(data, entry.title)])
 
 
 class FanimationBleFanEntity(FanimationBleEntity, FanEntity):
     """Representation of a Fanimation BLE fan."""
 
-    _attr_supported_features = (
-        FanEntityFeature.SET_SPEED
-        | FanEntityFeature.DIRECTION
-        | FanEntityFeature.TURN_ON
-        | FanEntityFeature.TURN_OFF
-    )
+    _attr_supported_features = SUPPORTED_FEATURES
+    _device_fields = FAN_FIELDS
 
-    def __init__(self, device: FanimationBleDevice) -> None:
+    def __init__(self, device: FanimationBleDevice, device_name: str) -> None:
         """Initialize the fan entity."""
-        super().__init__(device, "Fanimation Fan", "fan")
+        super().__init__(device, device_name, "Fanimation Fan", "fan")
+        if device.capabilities is not None and not device.capabilities.reverse:
+            self._attr_supported_features = (
+                SUPPORTED_FEATURES & ~FanEntityFeature.DIRECTION
+            )
 
     @property
     def is_on(self) -> bool | None:
@@ -52,9 +82,7 @@ class FanimationBleFanEntity(FanimationBleEntity, FanEntity):
     @property
     def percentage(self) -> Optional[int]:
         """Return the current speed percentage."""
-        if self._device.percentage is None or self._device.percentage == 0:
-            return 0
-        return ranged_value_to_percentage(SPEED_RANGE, self._device.percentage)
+        return speed_to_percentage(self._device.percentage)
 
     @property
     def speed_count(self) -> int:
@@ -68,16 +96,16 @@ class FanimationBleFanEntity(FanimationBleEntity, FanEntity):
 
     async def async_set_percentage(self, percentage: int) -> None:
         """Set the speed of the fan."""
-        if percentage == 0:
-            speed = 0
-        else:
-            speed = round(percentage_to_ranged_value(SPEED_RANGE, percentage))
-        await self._device.set_fan_speed(int(speed))
+        await self._device.apply_state(
+            speed=percentage_to_speed(percentage), priority=self._command_priority
+        )
 
     async def async_set_direction(self, direction: str) -> None:
         """Set the direction of the fan."""
-        direction_val = 1 if direction == "reverse" else 0
-        await self._device.set_direction(direction_val)
+        await self._device.apply_state(
+            direction=1 if direction == "reverse" else 0,
+            priority=self._command_priority,
+        )
 
     async def async_turn_on(self, percentage: int | None = None, **kwargs: Any) -> None:
         """Turn the fan on."""
@@ -85,4 +113,133 @@ class FanimationBleFanEntity(FanimationBleEntity, FanEntity):
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the fan off."""
-        await self.async_set_percentage(0)
\ No newline at end of file
+        await self.async_set_percentage(0)
+
+
+class FanimationBleGroupFanEntity(FanEntity):
+    """Representation of a group of Fanimation BLE fans."""
+
+    _attr_should_poll = False
+    _attr_supported_features = SUPPORTED_FEATURES
+
+    def __init__(self, group: FanimationBleGroup, name: str, entry_id: str) -> None:
+        """Initialize the group fan entity."""
+        self._group = group
+        self._attr_name = name
+        self._attr_unique_id = f"{entry_id}_group_fan"
+        # Member device each subscription was made on, by address
+        self._member_subscriptions: dict[
+            str, tuple[FanimationBleDevice, Callable[[], None]]
+        ] = {}
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self._state_writer = async_get_state_writer(self.hass)
+        self._async_subscribe_members()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_DEVICES_CHANGED, self._handle_devices_changed
+            )
+        )
+        self.async_on_remove(self._async_unsubscribe_members)
+        self.async_on_remove(lambda: self._state_writer.async_discard(self))
+
+    @callback
+    def _async_subscribe_members(self) -> None:
+        """Follow the members that are loaded, dropping unloaded devices."""
+        devices = {device.address: device for device in self._group.devices}
+        for address, (device, unsubscribe) in list(
+            self._member_subscriptions.items()
+        ):
+            if devices.get(address) is not device:
+                unsubscribe()
+                del self._member_subscriptions[address]
+        for address, device in devices.items():
+            if address not in self._member_subscriptions:
+                self._member_subscriptions[address] = (
+                    device,
+                    device.async_subscribe(self._handle_member_update, FAN_FIELDS),
+                )
+
+    @callback
+    def _async_unsubscribe_members(self) -> None:
+        """Stop following every member."""
+        for _, unsubscribe in self._member_subscriptions.values():
+            unsubscribe()
+        self._member_subscriptions.clear()
+
+    @callback
+    def _handle_devices_changed(self) -> None:
+        """Resubscribe after a member loaded or unloaded."""
+        self._async_subscribe_members()
+        self._state_writer.async_schedule(self)
+
+    @callback
+    def _handle_member_update(self, changed: frozenset[str]) -> None:
+        """Queue a state write after a member's speed or direction changed."""
+        self._state_writer.async_schedule(self)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return true if any fan in the group is on."""
+        return any(device.is_on for device in self._group.devices)
+
+    @property
+    def percentage(self) -> Optional[int]:
+        """Return the average speed percentage of the fans that are on."""
+        speeds = [
+            speed_to_percentage(device.percentage)
+            for device in self._group.devices
+            if device.is_on
+        ]
+        if not speeds:
+            return 0
+        return round(sum(speeds) / len(speeds))
+
+    @property
+    def speed_count(self) -> int:
+        """Return the number of speeds the fans support."""
+        return int_states_in_range(SPEED_RANGE)
+
+    @property
+    def current_direction(self) -> str | None:
+        """Return the direction shared by the group, if the fans agree."""
+        directions = {device.direction for device in self._group.devices}
+        if len(directions) != 1:
+            return None
+        return "reverse" if directions.pop() == 1 else "forward"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the members and the outcome of the last group command."""
+        results = self._group.last_results
+        return {
+            "members": self._group.members,
+            "failed_members": [r.address for r in results if not r.success],
+            "last_command_latency": max((r.latency for r in results), default=None),
+        }
+
+    async def async_set_percentage(self, percentage: int) -> None:
+        """Set the speed of every fan in the group."""
+        await self._group.async_apply_state(
+            speed=percentage_to_speed(percentage),
+            priority=command_priority(self._context),
+        )
+        self.async_write_ha_state()
+
+    async def async_set_direction(self, direction: str) -> None:
+        """Set the direction of every fan in the group."""
+        await self._group.async_apply_state(
+            direction=1 if direction == "reverse" else 0,
+            priority=command_priority(self._context),
+        )
+        self.async_write_ha_state()
+
+    async def async_turn_on(self, percentage: int | None = None, **kwargs: Any) -> None:
+        """Turn the fans on."""
+        await self.async_set_percentage(percentage or 50)  # Default to 50% speed
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn the fans off."""
+        await self.async_set_percentage(0)
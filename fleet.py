@@ -0,0 +1,122 @@
+"""Array-backed state of every Fanimation BLE fan."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from .codec import FanStatus
+
+# Bytes per fan: the reported status, then the desired state, each in
+# FanStatus field order
+STATUS_OFFSET = 0
+DESIRED_OFFSET = len(FanStatus._fields)
+ROW_SIZE = 2 * DESIRED_OFFSET
+
+IDX_SPEED = FanStatus._fields.index("speed")
+IDX_BRIGHTNESS = FanStatus._fields.index("brightness")
+IDX_TIMER = FanStatus._fields.index("timer_minutes")
+
+
+class FleetStateStore:
+    """Reported and desired state of many fans in one bytearray.
+
+    Every field fits in a byte, so a fan costs ROW_SIZE bytes however many
+    fans there are. Devices read and write their own row; the bulk queries
+    scan the array without touching the devices.
+    """
+
+    __slots__ = ("rows", "_index", "_free")
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self.rows = bytearray()
+        self._index: dict[str, int] = {}
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        """Return the number of fans registered."""
+        return len(self._index)
+
+    def __contains__(self, address: str) -> bool:
+        """Return true if ``address`` has a row."""
+        return address in self._index
+
+    def register(self, address: str) -> int:
+        """Return the offset of the row for ``address``, adding one if needed."""
+        if (offset := self._index.get(address)) is not None:
+            return offset
+        if self._free:
+            offset = self._free.pop()
+            # Whatever a released device wrote after unregister must not leak
+            self.rows[offset : offset + ROW_SIZE] = bytes(ROW_SIZE)
+        else:
+            offset = len(self.rows)
+            self.rows.extend(bytes(ROW_SIZE))
+        self._index[address] = offset
+        return offset
+
+    def unregister(self, address: str) -> None:
+        """Release the row of ``address`` for reuse."""
+        if (offset := self._index.pop(address, None)) is None:
+            return
+        self._free.append(offset)
+
+    def status(self, address: str) -> FanStatus:
+        """Return the reported status of ``address``."""
+        start = self._index[address] + STATUS_OFFSET
+        return FanStatus(*self.rows[start : start + DESIRED_OFFSET])
+
+    def desired(self, address: str) -> FanStatus:
+        """Return the desired state of ``address``."""
+        start = self._index[address] + DESIRED_OFFSET
+        return FanStatus(*self.rows[start : start + DESIRED_OFFSET])
+
+    def _select(
+        self, index: int, addresses: Iterable[str] | None
+    ) -> list[tuple[str, int]]:
+        """Return (address, reported field ``index``) for the chosen fans."""
+        rows = self.rows
+        if addresses is None:
+            items = self._index.items()
+        else:
+            items = (
+                (address, self._index[address])
+                for address in addresses
+                if address in self._index
+            )
+        return [(address, rows[offset + index]) for address, offset in items]
+
+    def fans_on(self, addresses: Iterable[str] | None = None) -> list[str]:
+        """Return the fans reporting a speed above zero."""
+        return [
+            address for address, speed in self._select(IDX_SPEED, addresses) if speed
+        ]
+
+    def lights_on(self, addresses: Iterable[str] | None = None) -> list[str]:
+        """Return the fans whose light reports a brightness above zero."""
+        return [
+            address
+            for address, brightness in self._select(IDX_BRIGHTNESS, addresses)
+            if brightness
+        ]
+
+    def timers_running(self, addresses: Iterable[str] | None = None) -> list[str]:
+        """Return the fans with their timer set."""
+        return [
+            address for address, timer in self._select(IDX_TIMER, addresses) if timer
+        ]
+
+    def average_speed(self, addresses: Iterable[str] | None = None) -> float | None:
+        """Return the mean reported speed of the chosen fans, if there are any."""
+        if not (speeds := self._select(IDX_SPEED, addresses)):
+            return None
+        return sum(speed for _, speed in speeds) / len(speeds)
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, int]]]:
+        """Return the reported and desired state of every fan."""
+        return {
+            address: {
+                "status": self.status(address)._asdict(),
+                "desired": self.desired(address)._asdict(),
+            }
+            for address in self._index
+        }
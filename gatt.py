@@ -0,0 +1,26 @@
+"""GATT handles of the Fanimation service, cached between connects."""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from bleak.backends.service import BleakGATTServiceCollection
+
+from .const import COMMAND_WRITE_UUID, FANIMATION_SERVICE_UUID, STATUS_NOTIFY_UUID
+
+
+class GattHandles(NamedTuple):
+    """Attribute handles resolved by service discovery."""
+
+    service: int
+    write: int
+    notify: int
+
+
+def resolve_handles(services: BleakGATTServiceCollection) -> GattHandles | None:
+    """Return the Fanimation handles in ``services``, or None if any is missing."""
+    service = services.get_service(FANIMATION_SERVICE_UUID)
+    write = services.get_characteristic(COMMAND_WRITE_UUID)
+    notify = services.get_characteristic(STATUS_NOTIFY_UUID)
+    if service is None or write is None or notify is None:
+        return None
+    return GattHandles(service.handle, write.handle, notify.handle)
@@ -0,0 +1,96 @@
+"""Concurrent control of several Fanimation BLE devices."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+import logging
+import time
+
+from .const import COMMAND_PRIORITY_USER, DEFAULT_GROUP_CONCURRENCY
+from .device import FanimationBleDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GroupMemberResult:
+    """Outcome of a group command for one member."""
+
+    address: str
+    success: bool
+    latency: float
+    error: str | None = None
+
+
+class FanimationBleGroup:
+    """Send the same target state to a set of devices at once."""
+
+    def __init__(
+        self,
+        members: Iterable[str],
+        get_device: Callable[[str], FanimationBleDevice | None],
+        max_concurrency: int = DEFAULT_GROUP_CONCURRENCY,
+    ) -> None:
+        """Initialize the group."""
+        self.members = list(members)
+        self._get_device = get_device
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.last_results: list[GroupMemberResult] = []
+
+    @property
+    def devices(self) -> list[FanimationBleDevice]:
+        """Return the member devices that are currently loaded."""
+        return [
+            device
+            for address in self.members
+            if (device := self._get_device(address)) is not None
+        ]
+
+    async def _async_run_member(
+        self,
+        address: str,
+        action: Callable[[FanimationBleDevice], Awaitable[bool]],
+    ) -> GroupMemberResult:
+        """Run ``action`` on one member and time it."""
+        if (device := self._get_device(address)) is None:
+            return GroupMemberResult(address, False, 0.0, "not loaded")
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                success = await action(device)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Group command failed for %s: %s", address, err)
+                return GroupMemberResult(
+                    address, False, time.monotonic() - start, str(err)
+                )
+            return GroupMemberResult(
+                address,
+                success,
+                time.monotonic() - start,
+                None if success else "not written",
+            )
+
+    async def async_apply(
+        self, action: Callable[[FanimationBleDevice], Awaitable[bool]]
+    ) -> list[GroupMemberResult]:
+        """Run ``action`` on every member concurrently and collect the results."""
+        self.last_results = await asyncio.gather(
+            *(self._async_run_member(address, action) for address in self.members)
+        )
+        return self.last_results
+
+    async def async_apply_state(
+        self,
+        speed: int | None = None,
+        direction: int | None = None,
+        brightness: int | None = None,
+        timer: int | None = None,
+        priority: int = COMMAND_PRIORITY_USER,
+    ) -> list[GroupMemberResult]:
+        """Apply the same state to every member, one write each."""
+        return await self.async_apply(
+            lambda device: device.apply_state(
+                speed, direction, brightness, timer, priority
+            )
+        )
@@ -9,7 +9,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .device import FanimationBleDevice
+from .device import LIGHT_FIELDS, FanimationBleDevice
 from .entity import FanimationBleEntity
 
 
@@ -20,7 +20,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up the light entity."""
     device: FanimationBleDevice = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([FanimationBleLightEntity(device)])
+    async_add_entities([FanimationBleLightEntity(device, entry.title)])
 
 
 class FanimationBleLightEntity(FanimationBleEntity, LightEntity):
@@ -28,10 +28,11 @@ class FanimationBleLightEntity(FanimationBleEntity, LightEntity):
 
     _attr_color_mode = ColorMode.BRIGHTNESS
     _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
+    _device_fields = LIGHT_FIELDS
 
-    def __init__(self, device: FanimationBleDevice) -> None:
+    def __init__(self, device: FanimationBleDevice, device_name: str) -> None:
         """Initialize the light entity."""
-        super().__init__(device, "Fanimation Light", "light")
+        super().__init__(device, device_name, "Fanimation Light", "light")
 
     @property
     def is_on(self) -> bool | None:
@@ -46,8 +47,12 @@ class FanimationBleLightEntity(FanimationBleEntity, LightEntity):
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         brightness = kwargs.get(ATTR_BRIGHTNESS, 255)
-        await self._device.set_light_brightness(brightness)
+        await self._device.apply_state(
+            brightness=brightness, priority=self._command_priority
+        )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        await self._device.set_light_brightness(0)
\ No newline at end of file
+        await self._device.apply_state(
+            brightness=0, priority=self._command_priority
+        )
\ No newline at end of file
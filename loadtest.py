@@ -0,0 +1,172 @@
+"""Load test FanimationBleDevice against simulated fans.
+
+Run from the Home Assistant config directory with, for example:
+
+    python -m custom_components.fanimation_ble.loadtest --fans 200 --drop-rate 0.01
+
+Every simulated fan is connected through a shared ConnectionManager and
+then sent a series of speed changes. A command counts as complete when the
+fan's status notification reports the new speed. The fans are then
+connected once more to compare connect-to-status time with and without
+cached GATT handles.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import time
+
+from .connection import ConnectionManager
+from .const import DEFAULT_WRITE_DEBOUNCE
+from .device import FAN_FIELDS, FanimationBleDevice
+from .simulator import SimulatedFleet, SimulatorConfig
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the nearest-rank ``pct`` percentile of sorted ``samples``."""
+    if not samples:
+        return float("nan")
+    return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+
+async def _async_run_commands(
+    device: FanimationBleDevice,
+    commands: int,
+    timeout: float,
+    rng: random.Random,
+    latencies: list[float],
+) -> int:
+    """Send speed changes to one device and return how many timed out."""
+    loop = asyncio.get_running_loop()
+    timeouts = 0
+    for _ in range(commands):
+        speed = rng.choice([s for s in range(1, 32) if s != device.status.speed])
+        confirmed: asyncio.Future[None] = loop.create_future()
+
+        def _on_update(changed: frozenset[str], speed: int = speed) -> None:
+            if device.status.speed == speed and not confirmed.done():
+                confirmed.set_result(None)
+
+        unsubscribe = device.async_subscribe(_on_update, FAN_FIELDS)
+        start = time.monotonic()
+        try:
+            await device.set_fan_speed(speed)
+            await asyncio.wait_for(confirmed, timeout)
+        except asyncio.TimeoutError:
+            timeouts += 1
+        else:
+            latencies.append(time.monotonic() - start)
+        finally:
+            unsubscribe()
+    return timeouts
+
+
+async def async_run(args: argparse.Namespace) -> None:
+    """Run the load test described by ``args``."""
+    config = SimulatorConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        connect_latency=args.connect_latency,
+        discovery_latency=args.discovery_latency,
+        connect_failure_rate=args.connect_failure_rate,
+        drop_rate=args.drop_rate,
+        corrupt_rate=args.corrupt_rate,
+        disconnect_rate=args.disconnect_rate,
+    )
+    fleet = SimulatedFleet(config, seed=args.seed)
+    manager = ConnectionManager(
+        slots_per_adapter=args.slots,
+        stagger=args.stagger,
+        backoff_base=args.connect_latency,
+    )
+    devices = [
+        FanimationBleDevice(
+            f"SIM:{index:06X}",
+            manager,
+            adapter=f"hci{index % args.adapters}",
+            write_debounce=args.debounce,
+            client_factory=fleet.client_factory,
+        )
+        for index in range(args.fans)
+    ]
+
+    start = time.monotonic()
+    connected = await asyncio.gather(*(device.connect() for device in devices))
+    connect_time = time.monotonic() - start
+    devices = [device for device, ok in zip(devices, connected) if ok]
+
+    rng = random.Random(args.seed)
+    latencies: list[float] = []
+    start = time.monotonic()
+    timeouts = await asyncio.gather(
+        *(
+            _async_run_commands(device, args.commands, args.timeout, rng, latencies)
+            for device in devices
+        )
+    )
+    elapsed = time.monotonic() - start
+    await asyncio.gather(*(device.disconnect() for device in devices))
+
+    # Connect again, now with the GATT handles found the first time
+    for device in devices:
+        device.start_connecting()
+    await asyncio.gather(*(device.async_warm_up() for device in devices))
+    await asyncio.sleep(args.timeout)
+    await asyncio.gather(*(device.disconnect() for device in devices))
+
+    latencies.sort()
+    total = len(devices) * args.commands
+    print(f"fans connected      {len(devices)}/{args.fans} in {connect_time:.2f}s")
+    print(f"commands            {total} in {elapsed:.2f}s")
+    print(f"throughput          {len(latencies) / elapsed:.1f} confirmed/s")
+    print(f"timeouts            {sum(timeouts)}")
+    print(f"coalesced writes    {sum(d.coalesced_writes for d in devices)}")
+    print(f"retried writes      {sum(d.retried_writes for d in devices)}")
+    print(f"abandoned writes    {sum(d.abandoned_writes for d in devices)}")
+    print(f"suppressed updates  {sum(d.suppressed_updates for d in devices)}")
+    for pct in (50, 90, 99, 100):
+        print(f"latency p{pct:<3}        {percentile(latencies, pct) * 1000:.1f} ms")
+    for label, name in (
+        ("discovered", "connect_to_status"),
+        ("cached", "connect_to_status_cached"),
+    ):
+        means = [
+            mean
+            for device in devices
+            if (mean := getattr(device.metrics, name).mean) is not None
+        ]
+        average = sum(means) / len(means) * 1000 if means else float("nan")
+        print(f"to status {label:<10} {average:.1f} ms")
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fans", type=int, default=100)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--adapters", type=int, default=2)
+    parser.add_argument("--slots", type=int, default=2)
+    parser.add_argument("--stagger", type=float, default=0.0)
+    parser.add_argument("--debounce", type=float, default=DEFAULT_WRITE_DEBOUNCE)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    parser.add_argument("--discovery-latency", type=float, default=0.5)
+    parser.add_argument("--connect-failure-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+    asyncio.run(async_run(args))
+
+
+if __name__ == "__main__":
+    main()
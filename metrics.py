@@ -0,0 +1,98 @@
+"""Lightweight measurements for Fanimation BLE devices."""
+from __future__ import annotations
+
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets in seconds; the last bucket is open
+DEFAULT_LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def record(self, seconds: float) -> None:
+        """Add one sample."""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean sample, if any were recorded."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        """Return the histogram in a JSON friendly form."""
+        buckets = {f"le_{bound:g}": n for bound, n in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class DeviceMetrics:
+    """Counters and latencies for one device, cheap enough for the hot path."""
+
+    __slots__ = (
+        "writes",
+        "write_errors",
+        "status_frames",
+        "invalid_frames",
+        "connects",
+        "connect_failures",
+        "disconnects",
+        "connect_time",
+        "write_time",
+        "write_to_notify",
+        "connect_to_status",
+        "connect_to_status_cached",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.writes = 0
+        self.write_errors = 0
+        self.status_frames = 0
+        self.invalid_frames = 0
+        self.connects = 0
+        self.connect_failures = 0
+        self.disconnects = 0
+        # Connect plus notification setup
+        self.connect_time = LatencyHistogram()
+        # Handing a frame to the adapter
+        self.write_time = LatencyHistogram()
+        # A state write until the next status frame
+        self.write_to_notify = LatencyHistogram()
+        # Starting a connect until the first notification, with service
+        # discovery and with cached GATT handles
+        self.connect_to_status = LatencyHistogram()
+        self.connect_to_status_cached = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        """Return the metrics in a JSON friendly form."""
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            data[name] = (
+                value.as_dict() if isinstance(value, LatencyHistogram) else value
+            )
+        return data
@@ -0,0 +1,49 @@
+"""Number platform for Fanimation BLE."""
+from __future__ import annotations
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .device import TIMER_FIELDS, FanimationBleDevice
+from .entity import FanimationBleEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the timer entity."""
+    device: FanimationBleDevice = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([FanimationBleTimerEntity(device, entry.title)])
+
+
+class FanimationBleTimerEntity(FanimationBleEntity, NumberEntity):
+    """Off timer of a Fanimation BLE fan; 0 disables it."""
+
+    _attr_icon = "mdi:timer-outline"
+    _attr_mode = NumberMode.BOX
+    _attr_native_min_value = 0
+    _attr_native_max_value = 255  # The timer is a single byte in the frame
+    _attr_native_step = 1
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _device_fields = TIMER_FIELDS
+
+    def __init__(self, device: FanimationBleDevice, device_name: str) -> None:
+        """Initialize the timer entity."""
+        super().__init__(device, device_name, "Fanimation Timer", "timer")
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the timer in minutes."""
+        return self._device.timer_minutes
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the timer."""
+        await self._device.apply_state(
+            timer=int(value), priority=self._command_priority
+        )
@@ -0,0 +1,135 @@
+"""Decode a protocol capture offline and summarise it per fan.
+
+Run from the Home Assistant config directory with, for example:
+
+    python -m custom_components.fanimation_ble.replay fanimation_ble_aabbccddeeff.jsonl
+
+The capture is streamed, so files of any size can be read. Received
+frames go through the same StatusDecoder as live notifications. For each
+fan the summary shows frame counts, checksum failures, the gaps between
+received frames and the time from each command to the next status frame.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+import logging
+
+from .capture import CaptureFrame, iter_capture
+from .codec import (
+    CMD_READ_STATUS,
+    CMD_WRITE_STATE,
+    IDX_COMMAND,
+    FanStatus,
+    StatusDecoder,
+)
+from .metrics import LatencyHistogram
+from .trace import TRACE_TX
+
+# Buckets for gaps between received frames, which poll intervals stretch
+GAP_BUCKETS = (0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 600.0)
+
+
+@dataclass
+class FanReport:
+    """Running statistics for the frames of one fan."""
+
+    decoder: StatusDecoder = field(default_factory=StatusDecoder)
+    tx_frames: int = 0
+    rx_frames: int = 0
+    checksum_failures: int = 0
+    unanswered: int = 0
+    last_rx: float | None = None
+    # Time and command byte of the last command not yet answered
+    pending: tuple[float, int] | None = None
+    last_status: FanStatus | None = None
+    rx_gaps: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram(GAP_BUCKETS)
+    )
+    write_to_status: LatencyHistogram = field(default_factory=LatencyHistogram)
+    read_to_status: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def add(self, item: CaptureFrame) -> str:
+        """Account for one frame and return a decoded description of it."""
+        if item.direction == TRACE_TX:
+            self.tx_frames += 1
+            if self.pending is not None:
+                self.unanswered += 1
+            command = item.frame[IDX_COMMAND] if len(item.frame) > IDX_COMMAND else -1
+            self.pending = (item.time, command)
+            return f"command 0x{command:02x}"
+
+        self.rx_frames += 1
+        if self.last_rx is not None:
+            self.rx_gaps.record(item.time - self.last_rx)
+        self.last_rx = item.time
+        if (status := self.decoder.decode(item.frame)) is None:
+            self.checksum_failures += 1
+            return "INVALID (checksum or length)"
+
+        if self.pending is not None:
+            sent, command = self.pending
+            if command == CMD_WRITE_STATE:
+                self.write_to_status.record(item.time - sent)
+            elif command == CMD_READ_STATUS:
+                self.read_to_status.record(item.time - sent)
+            self.pending = None
+        self.last_status = status
+        return str(status)
+
+
+def _format_histogram(histogram: LatencyHistogram) -> str:
+    """Return a one-line summary of ``histogram`` in milliseconds."""
+    if not histogram.count:
+        return "-"
+    return (
+        f"n={histogram.count} min={histogram.min * 1000:.1f} "
+        f"mean={histogram.mean * 1000:.1f} max={histogram.max * 1000:.1f} ms"
+    )
+
+
+def replay(path: str, address: str | None = None, decode: bool = False) -> None:
+    """Stream the capture at ``path`` and print the report."""
+    reports: dict[str, FanReport] = {}
+    first: float | None = None
+    for item in iter_capture(path):
+        if address is not None and item.address != address:
+            continue
+        if first is None:
+            first = item.time
+        report = reports.setdefault(item.address, FanReport())
+        description = report.add(item)
+        if decode:
+            print(
+                f"{item.time - first:10.3f} {item.address} {item.direction:>3} "
+                f"{item.frame.hex()} {description}"
+            )
+
+    for fan_address, report in sorted(reports.items()):
+        print(f"\n{fan_address}")
+        print(f"  frames sent         {report.tx_frames}")
+        print(f"  frames received     {report.rx_frames}")
+        print(f"  checksum failures   {report.checksum_failures}")
+        print(f"  unanswered commands {report.unanswered}")
+        print(f"  gaps between rx     {_format_histogram(report.rx_gaps)}")
+        print(f"  write to status     {_format_histogram(report.write_to_status)}")
+        print(f"  read to status      {_format_histogram(report.read_to_status)}")
+        print(f"  last status         {report.last_status}")
+
+
+def main() -> None:
+    """Parse arguments and replay a capture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture")
+    parser.add_argument("--address", default=None, help="only report this fan")
+    parser.add_argument(
+        "--decode", action="store_true", help="print every frame as it is read"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    replay(args.capture, args.address, args.decode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Precompiled multi-fan scenes for Fanimation BLE."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components.fan import ATTR_DIRECTION, ATTR_PERCENTAGE
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .codec import FanStatus, FrameEncoder
+from .const import (
+    ATTR_AT,
+    ATTR_TARGETS,
+    ATTR_TIMER,
+    DATA_SCENES,
+    DOMAIN,
+    SCENE_WARM_UP_TIMEOUT,
+    SERVICE_ACTIVATE_SCENE,
+    SERVICE_COMPILE_SCENE,
+    SERVICE_PREPARE_SCENE,
+)
+from .device import FanimationBleDevice
+from .fan import percentage_to_speed
+from .group import FanimationBleGroup, GroupMemberResult
+
+_LOGGER = logging.getLogger(__name__)
+
+SCENE_TARGET_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_PERCENTAGE): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(ATTR_DIRECTION): vol.In(["forward", "reverse"]),
+        vol.Optional(ATTR_BRIGHTNESS): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=255)
+        ),
+        vol.Optional(ATTR_TIMER): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+    }
+)
+COMPILE_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Required(ATTR_TARGETS): vol.All(
+            cv.ensure_list, [SCENE_TARGET_SCHEMA], vol.Length(min=1)
+        ),
+    }
+)
+SCENE_SCHEMA = vol.Schema({vol.Required(ATTR_NAME): cv.string})
+ACTIVATE_SCENE_SCHEMA = SCENE_SCHEMA.extend({vol.Optional(ATTR_AT): cv.datetime})
+
+
+@dataclass(frozen=True)
+class SceneTarget:
+    """Native values a scene sets on one fan; None leaves a field as is."""
+
+    speed: int | None = None
+    direction: int | None = None
+    brightness: int | None = None
+    timer_minutes: int | None = None
+
+    def resolve(self, current: FanStatus) -> FanStatus:
+        """Return ``current`` with the fields set by this target applied."""
+        return FanStatus(
+            *(
+                old if new is None else new
+                for old, new in zip(
+                    current,
+                    (self.speed, self.direction, self.brightness, self.timer_minutes),
+                )
+            )
+        )
+
+
+class FanimationBleScene:
+    """A named target state for several fans, encoded ahead of activation.
+
+    Each fan's frame is encoded when the scene is compiled. Fields the
+    scene leaves alone are taken from the fan's state at that time; if they
+    have changed by activation, that fan's frame is encoded again. A
+    scheduled activation warms the fans up SCENE_WARM_UP_TIMEOUT earlier.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        targets: dict[str, SceneTarget],
+        get_device: Callable[[str], FanimationBleDevice | None],
+    ) -> None:
+        """Initialize the scene."""
+        self.name = name
+        self.targets = targets
+        self._group = FanimationBleGroup(
+            targets, get_device, max_concurrency=max(len(targets), 1)
+        )
+        self._frames: dict[str, tuple[FanStatus, bytes]] = {}
+        self._encoder = FrameEncoder()
+        self._unsub_schedule: list[CALLBACK_TYPE] = []
+
+    def _frame_for(self, device: FanimationBleDevice) -> tuple[FanStatus, bytes]:
+        """Return the state and encoded frame this scene sends to ``device``."""
+        state = self.targets[device.address].resolve(device.desired)
+        compiled = self._frames.get(device.address)
+        if compiled is None or compiled[0] != state:
+            frame = bytes(self._encoder.encode(*state))
+            compiled = self._frames[device.address] = (state, frame)
+        return compiled
+
+    def compile(self) -> None:
+        """Encode the frames of every member that is loaded."""
+        for device in self._group.devices:
+            self._frame_for(device)
+
+    async def async_warm_up(self) -> list[GroupMemberResult]:
+        """Connect to every member ahead of an activation."""
+        return await self._group.async_apply(
+            lambda device: asyncio.wait_for(
+                device.async_warm_up(), SCENE_WARM_UP_TIMEOUT
+            )
+        )
+
+    async def async_activate(self) -> list[GroupMemberResult]:
+        """Send every member its frame at once."""
+        return await self._group.async_apply(
+            lambda device: device.async_send_compiled(*self._frame_for(device))
+        )
+
+    @callback
+    def async_schedule(self, hass: HomeAssistant, at: datetime) -> None:
+        """Activate at ``at``, warming up first; replaces an earlier schedule."""
+        self.async_cancel_schedule()
+
+        @callback
+        def _async_warm_up(now: datetime) -> None:
+            """Connect to the members shortly before the activation."""
+            hass.async_create_task(self._async_run("prepare", self.async_warm_up))
+
+        @callback
+        def _async_activate(now: datetime) -> None:
+            """Send the scene at the scheduled time."""
+            self._unsub_schedule.clear()
+            hass.async_create_task(self._async_run("activate", self.async_activate))
+
+        warm_up_at = at - timedelta(seconds=SCENE_WARM_UP_TIMEOUT)
+        if warm_up_at <= dt_util.utcnow():
+            _async_warm_up(dt_util.utcnow())
+        else:
+            self._unsub_schedule.append(
+                async_track_point_in_utc_time(hass, _async_warm_up, warm_up_at)
+            )
+        self._unsub_schedule.append(
+            async_track_point_in_utc_time(hass, _async_activate, at)
+        )
+
+    @callback
+    def async_cancel_schedule(self) -> None:
+        """Drop a scheduled activation, if any."""
+        for unsub in self._unsub_schedule:
+            unsub()
+        self._unsub_schedule.clear()
+
+    async def _async_run(
+        self,
+        action: str,
+        run: Callable[[], Awaitable[list[GroupMemberResult]]],
+    ) -> None:
+        """Run a scheduled scene action and report the members it failed for."""
+        _log_failures(action, self, await run())
+
+
+def _async_target_address(hass: HomeAssistant, entity_id: str) -> str:
+    """Return the address of the fan that ``entity_id`` belongs to."""
+    entry = er.async_get(hass).async_get(entity_id)
+    if entry is not None and entry.platform == DOMAIN:
+        device = hass.data.get(DOMAIN, {}).get(entry.config_entry_id)
+        if isinstance(device, FanimationBleDevice):
+            return device.address
+    raise ServiceValidationError(f"{entity_id} is not a Fanimation BLE fan")
+
+
+def _get_scene(hass: HomeAssistant, name: str) -> FanimationBleScene:
+    """Return the compiled scene called ``name``."""
+    if (scene := hass.data.get(DATA_SCENES, {}).get(name)) is None:
+        raise ServiceValidationError(f"No Fanimation BLE scene named {name}")
+    return scene
+
+
+def _log_failures(
+    action: str, scene: FanimationBleScene, results: list[GroupMemberResult]
+) -> None:
+    """Warn about the members a scene action failed for."""
+    if failed := [result for result in results if not result.success]:
+        _LOGGER.warning(
+            "Failed to %s scene %s for %s",
+            action,
+            scene.name,
+            ", ".join(f"{r.address} ({r.error})" for r in failed),
+        )
+
+
+def async_setup_scene_services(
+    hass: HomeAssistant, get_device: Callable[[str], FanimationBleDevice | None]
+) -> None:
+    """Register the scene services."""
+
+    async def _async_compile_scene(call: ServiceCall) -> None:
+        """Compile a scene from its targets, replacing any of the same name."""
+        targets = {}
+        for target in call.data[ATTR_TARGETS]:
+            address = _async_target_address(hass, target[ATTR_ENTITY_ID])
+            direction = target.get(ATTR_DIRECTION)
+            percentage = target.get(ATTR_PERCENTAGE)
+            targets[address] = SceneTarget(
+                speed=None if percentage is None else percentage_to_speed(percentage),
+                direction=None if direction is None else int(direction == "reverse"),
+                brightness=target.get(ATTR_BRIGHTNESS),
+                timer_minutes=target.get(ATTR_TIMER),
+            )
+        scene = FanimationBleScene(call.data[ATTR_NAME], targets, get_device)
+        scene.compile()
+        scenes = hass.data.setdefault(DATA_SCENES, {})
+        if (replaced := scenes.get(scene.name)) is not None:
+            replaced.async_cancel_schedule()
+        scenes[scene.name] = scene
+
+    async def _async_prepare_scene(call: ServiceCall) -> None:
+        """Connect to a scene's fans ahead of its activation."""
+        scene = _get_scene(hass, call.data[ATTR_NAME])
+        _log_failures("prepare", scene, await scene.async_warm_up())
+
+    async def _async_activate_scene(call: ServiceCall) -> None:
+        """Send a scene to all of its fans, now or at a scheduled time."""
+        scene = _get_scene(hass, call.data[ATTR_NAME])
+        if (at := call.data.get(ATTR_AT)) is None:
+            _log_failures("activate", scene, await scene.async_activate())
+            return
+        if (at := dt_util.as_utc(at)) <= dt_util.utcnow():
+            raise ServiceValidationError(f"{at.isoformat()} is in the past")
+        scene.async_schedule(hass, at)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_COMPILE_SCENE, _async_compile_scene, COMPILE_SCENE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PREPARE_SCENE, _async_prepare_scene, SCENE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_ACTIVATE_SCENE, _async_activate_scene, ACTIVATE_SCENE_SCHEMA
+    )
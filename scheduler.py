@@ -0,0 +1,96 @@
+"""Write coalescing for Fanimation BLE devices."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+
+from .const import DEFAULT_WRITE_DEBOUNCE, DEFAULT_WRITE_MAX_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WriteScheduler:
+    """Merge bursts of state changes into a single 0x31 write.
+
+    Every request restarts the debounce window, but a batch is never held
+    longer than ``max_delay`` after its first request. The flush callback
+    builds the frame from the device's latest desired state, so the last
+    change always wins.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[], Awaitable[bool]],
+        debounce: float = DEFAULT_WRITE_DEBOUNCE,
+        max_delay: float = DEFAULT_WRITE_MAX_DELAY,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._flush = flush
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._batch_started: float | None = None
+        self._waiters: list[asyncio.Future[bool]] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.coalesced = 0
+
+    async def async_request_write(self) -> bool:
+        """Request a write and wait until the frame carrying it is sent.
+
+        Returns the result of the flush, True if the frame was written.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._waiters:
+            self.coalesced += 1
+        else:
+            self._batch_started = now
+
+        waiter: asyncio.Future[bool] = loop.create_future()
+        self._waiters.append(waiter)
+
+        if self._timer is not None:
+            self._timer.cancel()
+        deadline = min(now + self.debounce, self._batch_started + self.max_delay)
+        self._timer = loop.call_at(deadline, self._fire)
+
+        return await waiter
+
+    def cancel(self) -> None:
+        """Drop the pending batch; anyone waiting on it gets False."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for waiter in self._take_batch():
+            if not waiter.done():
+                waiter.set_result(False)
+
+    def _take_batch(self) -> list[asyncio.Future[bool]]:
+        """Detach the current batch of waiters."""
+        waiters, self._waiters = self._waiters, []
+        self._timer = None
+        self._batch_started = None
+        return waiters
+
+    def _fire(self) -> None:
+        """Start writing the batch whose window just closed."""
+        task = asyncio.create_task(self._run_batch(self._take_batch()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, waiters: list[asyncio.Future[bool]]) -> None:
+        """Write one frame on behalf of every waiter in the batch."""
+        async with self._lock:
+            try:
+                written = await self._flush()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Coalesced write failed: %s", err)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+                return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(written)
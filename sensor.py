@@ -0,0 +1,124 @@
+"""Diagnostic sensor platform for Fanimation BLE."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .device import FanimationBleDevice
+from .entity import FanimationBleEntity
+from .metrics import LatencyHistogram
+
+# Measurements change on every frame, so read them periodically instead
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+def _mean_ms(histogram: LatencyHistogram) -> float | None:
+    """Return the mean of ``histogram`` in milliseconds."""
+    if (mean := histogram.mean) is None:
+        return None
+    return round(mean * 1000, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class FanimationBleSensorEntityDescription(SensorEntityDescription):
+    """Describes a Fanimation BLE diagnostic sensor."""
+
+    value_fn: Callable[[FanimationBleDevice], float | int | None]
+
+
+SENSORS: tuple[FanimationBleSensorEntityDescription, ...] = (
+    FanimationBleSensorEntityDescription(
+        key="write_errors",
+        name="Fanimation Write Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda device: device.metrics.write_errors,
+    ),
+    FanimationBleSensorEntityDescription(
+        key="invalid_frames",
+        name="Fanimation Invalid Frames",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda device: device.metrics.invalid_frames,
+    ),
+    FanimationBleSensorEntityDescription(
+        key="disconnects",
+        name="Fanimation Disconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda device: device.metrics.disconnects,
+    ),
+    FanimationBleSensorEntityDescription(
+        key="connect_time",
+        name="Fanimation Connect Time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda device: _mean_ms(device.metrics.connect_time),
+    ),
+    FanimationBleSensorEntityDescription(
+        key="write_to_notify",
+        name="Fanimation Response Time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda device: _mean_ms(device.metrics.write_to_notify),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the diagnostic sensor entities."""
+    device: FanimationBleDevice = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        FanimationBleDiagnosticSensor(device, entry.title, description)
+        for description in SENSORS
+    )
+
+
+class FanimationBleDiagnosticSensor(FanimationBleEntity, SensorEntity):
+    """A measurement of how a Fanimation BLE device is performing."""
+
+    entity_description: FanimationBleSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        device: FanimationBleDevice,
+        device_name: str,
+        description: FanimationBleSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, device_name, description.name, description.key)
+        self.entity_description = description
+
+    @property
+    def available(self) -> bool:
+        """Return true; the counters matter most while the fan is unreachable."""
+        return True
+
+    @property
+    def extra_state_attributes(self) -> None:
+        """Return no attributes; there is no desired state to confirm."""
+        return None
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current measurement."""
+        return self.entity_description.value_fn(self._device)
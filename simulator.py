@@ -0,0 +1,251 @@
+"""In-process simulation of Fanimation BLE fans.
+
+A SimulatedFleet hands out SimulatedBleakClient objects that can be passed
+to FanimationBleDevice as its ``client_factory``. Each client talks to a
+SimulatedFan that implements the 0x30/0x31 protocol, with configurable
+latency, lost writes, corrupted notifications and dropped links.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import random
+
+from bleak.exc import BleakCharacteristicNotFoundError, BleakError
+
+from .codec import (
+    CMD_READ_STATUS,
+    CMD_WRITE_STATE,
+    FRAME_HEADER,
+    FRAME_LENGTH,
+    IDX_BRIGHTNESS,
+    IDX_CHECKSUM,
+    IDX_COMMAND,
+    IDX_DIRECTION,
+    IDX_FEATURES,
+    IDX_SPEED,
+    IDX_TIMER,
+    compute_checksum,
+)
+from .const import COMMAND_WRITE_UUID, FANIMATION_SERVICE_UUID, STATUS_NOTIFY_UUID
+
+# Attribute handles of the simulated Fanimation service
+SERVICE_HANDLE = 0x000C
+WRITE_HANDLE = 0x000D
+NOTIFY_HANDLE = 0x000F
+
+
+@dataclass
+class SimulatorConfig:
+    """Fault and timing behaviour of simulated fans."""
+
+    # One-way radio latency in seconds, plus up to ``jitter`` extra
+    latency: float = 0.01
+    jitter: float = 0.005
+    connect_latency: float = 0.05
+    # Service discovery, skipped when the client may use its GATT cache
+    discovery_latency: float = 0.0
+    # Probabilities applied per connect, write or notification
+    connect_failure_rate: float = 0.0
+    drop_rate: float = 0.0
+    corrupt_rate: float = 0.0
+    disconnect_rate: float = 0.0
+
+
+class SimulatedFan:
+    """Peripheral side of the protocol for one fan."""
+
+    def __init__(self, address: str) -> None:
+        """Initialize the fan."""
+        self.address = address
+        self.speed = 0
+        self.direction = 0
+        self.brightness = 0
+        self.timer_minutes = 0
+        # Feature bits reported in status frames; 0 reports none
+        self.features = 0
+        self.writes = 0
+        self.invalid_writes = 0
+
+    def status_frame(self) -> bytearray:
+        """Return a status frame for the current state."""
+        frame = bytearray(FRAME_LENGTH)
+        frame[0] = FRAME_HEADER
+        frame[IDX_COMMAND] = CMD_WRITE_STATE
+        frame[IDX_SPEED] = self.speed
+        frame[IDX_DIRECTION] = self.direction
+        frame[IDX_FEATURES] = self.features
+        frame[IDX_BRIGHTNESS] = self.brightness
+        frame[IDX_TIMER] = self.timer_minutes
+        frame[IDX_CHECKSUM] = compute_checksum(frame)
+        return frame
+
+    def handle_write(self, data: bytes) -> bytearray | None:
+        """Apply a command and return the status frame to notify, if any."""
+        self.writes += 1
+        if len(data) != FRAME_LENGTH or compute_checksum(data) != data[IDX_CHECKSUM]:
+            self.invalid_writes += 1
+            return None
+        if data[IDX_COMMAND] == CMD_WRITE_STATE:
+            self.speed = data[IDX_SPEED]
+            self.direction = data[IDX_DIRECTION]
+            self.brightness = data[IDX_BRIGHTNESS]
+            self.timer_minutes = data[IDX_TIMER]
+        elif data[IDX_COMMAND] != CMD_READ_STATUS:
+            return None
+        return self.status_frame()
+
+
+@dataclass(frozen=True)
+class _SimulatedAttribute:
+    """A discovered service or characteristic."""
+
+    uuid: str
+    handle: int
+
+
+class SimulatedServices:
+    """The discovered services of a simulated fan."""
+
+    _attributes = {
+        FANIMATION_SERVICE_UUID: _SimulatedAttribute(
+            FANIMATION_SERVICE_UUID, SERVICE_HANDLE
+        ),
+        COMMAND_WRITE_UUID: _SimulatedAttribute(COMMAND_WRITE_UUID, WRITE_HANDLE),
+        STATUS_NOTIFY_UUID: _SimulatedAttribute(STATUS_NOTIFY_UUID, NOTIFY_HANDLE),
+    }
+
+    def get_service(self, specifier) -> _SimulatedAttribute | None:
+        """Return the service with UUID ``specifier``."""
+        if specifier == FANIMATION_SERVICE_UUID:
+            return self._attributes[specifier]
+        return None
+
+    def get_characteristic(self, specifier) -> _SimulatedAttribute | None:
+        """Return the characteristic with handle or UUID ``specifier``."""
+        for attribute in self._attributes.values():
+            if specifier in (attribute.uuid, attribute.handle):
+                return None if attribute.handle == SERVICE_HANDLE else attribute
+        return None
+
+
+class SimulatedBleakClient:
+    """Stand-in for BleakClient connected to a SimulatedFan."""
+
+    def __init__(
+        self,
+        fan: SimulatedFan,
+        config: SimulatorConfig,
+        rng: random.Random,
+        disconnected_callback: Callable[[SimulatedBleakClient], None] | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self.address = fan.address
+        self._fan = fan
+        self._config = config
+        self._rng = rng
+        self._disconnected_callback = disconnected_callback
+        self._notify_handler: Callable[[int, bytearray], None] | None = None
+        self._connected = False
+        self.services = SimulatedServices()
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true if the simulated link is up."""
+        return self._connected
+
+    def _delay(self) -> float:
+        """Return one simulated radio hop."""
+        return self._config.latency + self._rng.uniform(0, self._config.jitter)
+
+    async def connect(self, dangerous_use_bleak_cache: bool = False) -> bool:
+        """Open the simulated link and discover services unless cached."""
+        await asyncio.sleep(self._config.connect_latency)
+        if self._rng.random() < self._config.connect_failure_rate:
+            raise BleakError(f"Simulated connect failure for {self.address}")
+        if not dangerous_use_bleak_cache:
+            await asyncio.sleep(self._config.discovery_latency)
+        self._connected = True
+        return True
+
+    def _check_characteristic(self, char_specifier) -> None:
+        """Raise like Bleak if ``char_specifier`` is not a known characteristic."""
+        if self.services.get_characteristic(char_specifier) is None:
+            raise BleakCharacteristicNotFoundError(char_specifier)
+
+    async def disconnect(self) -> bool:
+        """Close the simulated link."""
+        self._drop_link()
+        return True
+
+    def _drop_link(self) -> None:
+        """Mark the link down and tell the owner."""
+        if not self._connected:
+            return
+        self._connected = False
+        self._notify_handler = None
+        if self._disconnected_callback is not None:
+            self._disconnected_callback(self)
+
+    async def start_notify(self, char_specifier, callback) -> None:
+        """Subscribe to status notifications."""
+        if not self._connected:
+            raise BleakError("Not connected")
+        self._check_characteristic(char_specifier)
+        self._notify_handler = callback
+
+    async def stop_notify(self, char_specifier) -> None:
+        """Unsubscribe from status notifications."""
+        self._notify_handler = None
+
+    async def write_gatt_char(self, char_specifier, data, response=None) -> None:
+        """Deliver a command to the fan after the simulated latency."""
+        if not self._connected:
+            raise BleakError("Not connected")
+        self._check_characteristic(char_specifier)
+        # The caller may reuse its buffer as soon as the write returns
+        data = bytes(data)
+        await asyncio.sleep(self._delay())
+        if self._rng.random() < self._config.disconnect_rate:
+            self._drop_link()
+            raise BleakError(f"Simulated disconnect from {self.address}")
+        if self._rng.random() < self._config.drop_rate:
+            return
+        if (frame := self._fan.handle_write(data)) is None:
+            return
+        if self._rng.random() < self._config.corrupt_rate:
+            frame[IDX_CHECKSUM] ^= 0xFF
+        asyncio.get_running_loop().call_later(self._delay(), self._notify, frame)
+
+    def _notify(self, frame: bytearray) -> None:
+        """Deliver a notification if still subscribed."""
+        if self._connected and self._notify_handler is not None:
+            self._notify_handler(0, frame)
+
+
+class SimulatedFleet:
+    """A set of simulated fans sharing one fault configuration."""
+
+    def __init__(
+        self, config: SimulatorConfig | None = None, seed: int | None = None
+    ) -> None:
+        """Initialize the fleet."""
+        self.config = config or SimulatorConfig()
+        self.fans: dict[str, SimulatedFan] = {}
+        self._rng = random.Random(seed)
+
+    def add_fan(self, address: str) -> SimulatedFan:
+        """Create a simulated fan at ``address``."""
+        fan = self.fans[address] = SimulatedFan(address)
+        return fan
+
+    def client_factory(
+        self, address: str, disconnected_callback=None
+    ) -> SimulatedBleakClient:
+        """Build a client for ``address``; usable as a device client factory."""
+        if (fan := self.fans.get(address)) is None:
+            fan = self.add_fan(address)
+        return SimulatedBleakClient(
+            fan, self.config, self._rng, disconnected_callback
+        )
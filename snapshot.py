@@ -0,0 +1,79 @@
+"""Fleet-wide state snapshot service for Fanimation BLE."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import area_registry as ar, device_registry as dr
+
+from .const import DATA_FLEET_STATE, DOMAIN, SERVICE_FLEET_SNAPSHOT
+from .fleet import FleetStateStore
+
+
+@callback
+def async_get_fleet_state(hass: HomeAssistant) -> FleetStateStore:
+    """Return the state store shared by all devices of the integration."""
+    if (store := hass.data.get(DATA_FLEET_STATE)) is None:
+        store = hass.data[DATA_FLEET_STATE] = FleetStateStore()
+    return store
+
+
+@callback
+def _async_fan_areas(hass: HomeAssistant) -> dict[str, str | None]:
+    """Return the area name of every fan device, by address."""
+    areas = ar.async_get(hass)
+    fan_areas: dict[str, str | None] = {}
+    for device in dr.async_get(hass).devices.values():
+        for domain, address in device.identifiers:
+            if domain != DOMAIN:
+                continue
+            area = areas.async_get_area(device.area_id) if device.area_id else None
+            fan_areas[address] = area.name if area is not None else None
+    return fan_areas
+
+
+@callback
+def async_fleet_snapshot(hass: HomeAssistant) -> dict[str, Any]:
+    """Return the state of every loaded fan with counts over the fleet."""
+    store = async_get_fleet_state(hass)
+    fans = store.snapshot()
+    fan_areas = _async_fan_areas(hass)
+    by_area: dict[str | None, list[str]] = {}
+    for address, fan in fans.items():
+        fan["area"] = area = fan_areas.get(address)
+        by_area.setdefault(area, []).append(address)
+    return {
+        "fans": fans,
+        "fans_on": store.fans_on(),
+        "lights_on": store.lights_on(),
+        "timers_running": store.timers_running(),
+        "average_speed": store.average_speed(),
+        "average_speed_by_area": {
+            area: store.average_speed(addresses)
+            for area, addresses in by_area.items()
+            if area is not None
+        },
+    }
+
+
+@callback
+def async_setup_snapshot_service(hass: HomeAssistant) -> None:
+    """Register the fleet snapshot service."""
+
+    @callback
+    def _async_fleet_snapshot(call: ServiceCall) -> ServiceResponse:
+        """Return the state of the whole fleet."""
+        return async_fleet_snapshot(hass)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FLEET_SNAPSHOT,
+        _async_fleet_snapshot,
+        supports_response=SupportsResponse.ONLY,
+    )
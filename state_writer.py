@@ -0,0 +1,72 @@
+"""Batched entity state writes shared by all Fanimation BLE devices."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .const import DATA_STATE_WRITER, STATE_WRITE_WINDOW
+
+
+class StateWriteBatcher:
+    """Collect entities whose state changed and write them together.
+
+    The first change opens a window of ``window`` seconds; every entity
+    marked before it closes is written once when it does. A burst of
+    notifications from many fans then costs one loop callback, and an
+    entity changed several times in the window is written only once.
+    """
+
+    def __init__(self, window: float = STATE_WRITE_WINDOW) -> None:
+        """Initialize the batcher."""
+        self.window = window
+        self._dirty: dict[Entity, None] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self.requested = 0
+        self.written = 0
+        self.flushes = 0
+
+    @callback
+    def async_schedule(self, entity: Entity) -> None:
+        """Write the state of ``entity`` when the current window closes."""
+        self.requested += 1
+        self._dirty[entity] = None
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            if self.window > 0:
+                self._timer = loop.call_later(self.window, self._async_flush)
+            else:
+                self._timer = loop.call_soon(self._async_flush)
+
+    @callback
+    def async_discard(self, entity: Entity) -> None:
+        """Drop a pending write, e.g. for an entity being removed."""
+        self._dirty.pop(entity, None)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Write every entity marked during the window."""
+        self._timer = None
+        dirty, self._dirty = self._dirty, {}
+        self.flushes += 1
+        for entity in dirty:
+            if entity.hass is not None:
+                self.written += 1
+                entity.async_write_ha_state()
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters in a JSON friendly form."""
+        return {
+            "requested": self.requested,
+            "written": self.written,
+            "flushes": self.flushes,
+        }
+
+
+@callback
+def async_get_state_writer(hass: HomeAssistant) -> StateWriteBatcher:
+    """Return the batcher shared by all entities of the integration."""
+    if (writer := hass.data.get(DATA_STATE_WRITER)) is None:
+        writer = hass.data[DATA_STATE_WRITER] = StateWriteBatcher()
+    return writer
@@ -0,0 +1,99 @@
+"""Persistent per-fan data of Fanimation BLE devices."""
+from __future__ import annotations
+
+from typing import Generic, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .codec import FanStatus
+from .const import (
+    DATA_GATT_CACHE,
+    DATA_STATE_CACHE,
+    GATT_STORAGE_KEY,
+    STATE_CACHE_SAVE_DELAY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from .gatt import GattHandles
+
+_T = TypeVar("_T", bound=tuple)
+
+
+class _AddressCache(Generic[_T]):
+    """Named tuples of integers by fan address, saved to Home Assistant storage."""
+
+    _key: str
+    _tuple_type: type[_T]
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, list[int]]] = Store(
+            hass, STORAGE_VERSION, self._key
+        )
+        self._data: dict[str, list[int]] = {}
+
+    async def async_load(self) -> None:
+        """Load the saved values."""
+        self._data = await self._store.async_load() or {}
+
+    def get(self, address: str) -> _T | None:
+        """Return the saved value for ``address``, if any."""
+        if (values := self._data.get(address)) is None:
+            return None
+        return self._tuple_type(*values)
+
+    @callback
+    def async_update(self, address: str, value: _T) -> None:
+        """Record a new value and schedule a save."""
+        values = list(value)
+        if self._data.get(address) == values:
+            return
+        self._data[address] = values
+        self._store.async_delay_save(lambda: self._data, STATE_CACHE_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, address: str) -> None:
+        """Forget a device."""
+        if self._data.pop(address, None) is not None:
+            self._store.async_delay_save(lambda: self._data, STATE_CACHE_SAVE_DELAY)
+
+
+class FanimationBleStateCache(_AddressCache[FanStatus]):
+    """Last decoded status of every fan."""
+
+    _key = STORAGE_KEY
+    _tuple_type = FanStatus
+
+
+class FanimationBleGattCache(_AddressCache[GattHandles]):
+    """GATT handles of every fan, so connects can skip service discovery."""
+
+    _key = GATT_STORAGE_KEY
+    _tuple_type = GattHandles
+
+
+async def _async_get_cache(
+    hass: HomeAssistant, data_key: str, cache_type: type[_AddressCache]
+) -> _AddressCache:
+    """Return the shared cache stored at ``data_key``, loading it on first use."""
+    if (load := hass.data.get(data_key)) is None:
+
+        async def _async_load() -> _AddressCache:
+            cache = cache_type(hass)
+            await cache.async_load()
+            return cache
+
+        # Entries set up concurrently all wait on the same load
+        load = hass.data[data_key] = hass.async_create_task(_async_load())
+    return await load
+
+
+async def async_get_state_cache(hass: HomeAssistant) -> FanimationBleStateCache:
+    """Return the shared state cache, loading it on first use."""
+    return await _async_get_cache(hass, DATA_STATE_CACHE, FanimationBleStateCache)
+
+
+async def async_get_gatt_cache(hass: HomeAssistant) -> FanimationBleGattCache:
+    """Return the shared GATT handle cache, loading it on first use."""
+    return await _async_get_cache(hass, DATA_GATT_CACHE, FanimationBleGattCache)
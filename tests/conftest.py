@@ -0,0 +1,11 @@
+"""Test setup for the Fanimation BLE integration."""
+from pathlib import Path
+import sys
+import types
+
+# The repository root is the integration package. The device layer doesn't
+# need Home Assistant, so load the package without running its __init__.
+if "fanimation_ble" not in sys.modules:
+    package = types.ModuleType("fanimation_ble")
+    package.__path__ = [str(Path(__file__).parent.parent)]
+    sys.modules["fanimation_ble"] = package
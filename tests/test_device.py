@@ -0,0 +1,217 @@
+"""Tests for FanimationBleDevice against simulated fans."""
+import asyncio
+
+from bleak.exc import BleakError
+
+from fanimation_ble.codec import FanStatus
+from fanimation_ble.connection import ConnectionManager
+from fanimation_ble.device import FanimationBleDevice
+from fanimation_ble.gatt import GattHandles
+from fanimation_ble.simulator import (
+    NOTIFY_HANDLE,
+    SERVICE_HANDLE,
+    WRITE_HANDLE,
+    SimulatedFleet,
+    SimulatorConfig,
+)
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def _make_device(
+    fleet: SimulatedFleet, passive: bool = False
+) -> FanimationBleDevice:
+    """Return a device talking to ``fleet`` with short timers."""
+    device = FanimationBleDevice(
+        ADDRESS,
+        ConnectionManager(stagger=0, backoff_base=0.01, backoff_max=0.01),
+        write_debounce=0.01,
+        write_max_delay=0.02,
+        passive=passive,
+        client_factory=fleet.client_factory,
+    )
+    device.ack_timeout = 0.05
+    return device
+
+
+def _fail_writes(device: FanimationBleDevice, count: int) -> None:
+    """Make the next ``count`` writes on the device's link raise BleakError."""
+    client = device._client
+    write = client.write_gatt_char
+
+    async def _write_gatt_char(char_specifier, data, response=None):
+        nonlocal count
+        if count > 0:
+            count -= 1
+            raise BleakError("Simulated write failure")
+        await write(char_specifier, data, response)
+
+    client.write_gatt_char = _write_gatt_char
+
+
+def test_failed_write_is_retried() -> None:
+    """A write that raises while the link stays up is sent again."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(), seed=1)
+        fan = fleet.add_fan(ADDRESS)
+        device = _make_device(fleet)
+        assert await device.connect()
+        _fail_writes(device, 1)
+
+        await device.apply_state(speed=10)
+        await asyncio.sleep(0.3)
+
+        assert fan.speed == 10
+        assert device.status.speed == 10
+        assert device.pending_fields == frozenset()
+        await device.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_unsent_write_falls_back_to_reported_state() -> None:
+    """A write that can never be sent shows the fan's state again."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(), seed=1)
+        fan = fleet.add_fan(ADDRESS)
+        device = _make_device(fleet)
+        assert await device.connect()
+        _fail_writes(device, 100)
+
+        await device.apply_state(speed=10)
+        await asyncio.sleep(0.5)
+
+        assert fan.speed == 0
+        assert device.abandoned_writes == 1
+        assert device.pending_fields == frozenset()
+        assert device.percentage == 0
+
+        # Later reports are applied rather than taken for stale frames
+        fan.speed = 5
+        device.handle_advertisement(bytes(fan.status_frame()))
+        assert device.status.speed == 5
+        assert device.percentage == 5
+        await device.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_write_during_slow_reconnect_is_replayed() -> None:
+    """A write made while the link is down waits for the reconnect."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(), seed=1)
+        fan = fleet.add_fan(ADDRESS)
+        device = _make_device(fleet)
+        assert await device.connect()
+        # Reconnecting takes far longer than the whole retry budget
+        fleet.config.connect_latency = 0.5
+        device._client._drop_link()
+
+        await device.apply_state(speed=10)
+        await asyncio.sleep(1.0)
+
+        assert fan.speed == 10
+        assert device.abandoned_writes == 0
+        assert device.status.speed == 10
+        assert device.pending_fields == frozenset()
+        await device.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_stale_gatt_handles_are_rediscovered() -> None:
+    """Cached handles that name other attributes are replaced, not used."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(), seed=1)
+        fan = fleet.add_fan(ADDRESS)
+        device = _make_device(fleet)
+        # Both handles still exist, but as each other's characteristic
+        device.gatt_handles = GattHandles(SERVICE_HANDLE, NOTIFY_HANDLE, WRITE_HANDLE)
+        assert await device.connect()
+        assert device.gatt_handles == GattHandles(
+            SERVICE_HANDLE, WRITE_HANDLE, NOTIFY_HANDLE
+        )
+
+        await device.apply_state(speed=10)
+        await asyncio.sleep(0.3)
+        assert fan.speed == 10
+        await device.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_passive_connect_failure_falls_back_to_advertisements() -> None:
+    """A passive fan that can't be reached keeps following advertisements."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(connect_failure_rate=1.0), seed=1)
+        fan = fleet.add_fan(ADDRESS)
+        device = _make_device(fleet, passive=True)
+        device.handle_advertisement(bytes(fan.status_frame()))
+
+        await device.apply_state(speed=10)
+        await asyncio.sleep(0.5)
+
+        assert device.pending_fields == frozenset()
+        assert device.desired == FanStatus(0, 0, 0, 0)
+
+        fan.brightness = 100
+        device.handle_advertisement(bytes(fan.status_frame()))
+        assert device.brightness == 100
+        await device.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_availability_follows_link_and_advertisements() -> None:
+    """Active fans are available while connected, passive ones while heard."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(), seed=1)
+        fan = fleet.add_fan(ADDRESS)
+        changes = []
+
+        device = _make_device(fleet)
+        device.async_subscribe_availability(lambda: changes.append(device.available))
+        assert not device.available
+        assert await device.connect()
+        await device.disconnect()
+        assert changes == [True, False]
+
+        device = _make_device(fleet, passive=True)
+        assert not device.available
+        device.handle_advertisement(bytes(fan.status_frame()))
+        assert device.available
+        await device.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_disconnect_during_connect_closes_the_link() -> None:
+    """A connect that finishes after disconnect() doesn't leave a link open."""
+
+    async def _run() -> None:
+        fleet = SimulatedFleet(SimulatorConfig(connect_latency=0.2), seed=1)
+        fleet.add_fan(ADDRESS)
+        clients = []
+
+        def _client_factory(address, disconnected_callback=None):
+            client = fleet.client_factory(address, disconnected_callback)
+            clients.append(client)
+            return client
+
+        device = _make_device(fleet, passive=True)
+        device._client_factory = _client_factory
+        warm_up = asyncio.create_task(device.async_warm_up())
+        await asyncio.sleep(0.05)
+        await device.disconnect()
+
+        assert not await warm_up
+        assert not device.is_connected
+        assert not any(client.is_connected for client in clients)
+
+    asyncio.run(_run())
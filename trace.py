@@ -0,0 +1,70 @@
+"""Opt-in protocol trace of the frames exchanged with a fan."""
+from __future__ import annotations
+
+from collections import deque
+import time
+
+from .capture import CaptureRecorder
+from .const import TRACE_BUFFER_SIZE
+
+# Frame directions
+TRACE_TX = "tx"
+TRACE_RX = "rx"
+TRACE_ADVERTISEMENT = "adv"
+
+
+class ProtocolTrace:
+    """Bounded ring buffer of raw frames, optionally copied to a recorder.
+
+    Callers check ``enabled`` before calling ``record`` so a disabled trace
+    costs one attribute read. Frames are stored as bytes and only formatted
+    when the trace is exported.
+    """
+
+    __slots__ = ("address", "enabled", "buffering", "recorder", "_frames")
+
+    def __init__(self, address: str, maxlen: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize the trace."""
+        self.address = address
+        self.enabled = False
+        self.buffering = False
+        self.recorder: CaptureRecorder | None = None
+        self._frames: deque[tuple[float, str, bytes]] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        """Return the number of frames held."""
+        return len(self._frames)
+
+    def set_buffering(self, buffering: bool) -> None:
+        """Turn the ring buffer on or off."""
+        self.buffering = buffering
+        self._update_enabled()
+
+    def set_recorder(self, recorder: CaptureRecorder | None) -> None:
+        """Copy frames to ``recorder``, or stop copying them if None."""
+        self.recorder = recorder
+        self._update_enabled()
+
+    def _update_enabled(self) -> None:
+        """Enable the trace if anything consumes its frames."""
+        self.enabled = self.buffering or self.recorder is not None
+
+    def record(self, direction: str, frame: bytes | bytearray | memoryview) -> None:
+        """Add a frame; the data is copied as callers may reuse their buffer."""
+        timestamp = time.time()
+        frame = bytes(frame)
+        if self.buffering:
+            self._frames.append((timestamp, direction, frame))
+        if self.recorder is not None:
+            self.recorder.record(timestamp, self.address, direction, frame)
+
+    def clear(self) -> None:
+        """Drop all recorded frames."""
+        self._frames.clear()
+
+    def as_list(self) -> list[dict]:
+        """Return the frames, oldest first, in a JSON friendly form."""
+        return [
+            {"time": timestamp, "direction": direction, "frame": frame.hex()}
+            for timestamp, direction, frame in self._frames
+        ]